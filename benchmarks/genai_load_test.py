@@ -0,0 +1,147 @@
+"""
+Load test for the GenAI path against the bundled mock server (or any
+OpenAI-compatible --base-url).
+
+    python benchmarks/genai_load_test.py --mode single --requests 50 --concurrency 4
+    python benchmarks/genai_load_test.py --mode stream --latency 0.5
+    python benchmarks/genai_load_test.py --mode batch --concurrency 10 --error-rate 0.1
+
+Reports latency percentiles, throughput and errors by type, plus the
+resilience counters (attempts, retries, circuit rejections) and the
+engine's own call metrics (token usage per model). Streaming runs
+also report time to first chunk. Pass --retries to exercise backoff.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from benchmarks.mock_llm_server import MockConfig, start_mock_server
+from src.explainability import genai_engine
+from src.explainability.batch_engine import generate_playbooks
+from src.explainability.metrics import format_summary
+
+
+LEVERS = ["SLEEP", "ATTENDANCE", "RESOURCES", "MOTIVATION", "TUTORING"]
+
+
+def make_payloads(n: int):
+    # Distinct payloads so no two requests share a prompt
+    return [
+        {
+            "persona_label": "Overworked Strugglers",
+            "risk_level": "High",
+            "effort_outcome_gap": round(-1.0 - i / 100, 2),
+            "primary_lever": LEVERS[i % len(LEVERS)],
+            "key_drivers": [6, 70 + i % 30, 10 + i % 20],
+            "student_context": {"School_Type_Public": 1, "learning_disabilities": 0},
+        }
+        for i in range(n)
+    ]
+
+
+def timed_single(payload):
+    start = time.perf_counter()
+    try:
+        genai_engine.generate_teacher_explanation(payload)
+        return time.perf_counter() - start, None, None
+    except Exception as e:
+        return time.perf_counter() - start, None, type(e).__name__
+
+
+def timed_stream(payload):
+    start = time.perf_counter()
+    first = None
+    try:
+        for _ in genai_engine.stream_teacher_explanation(payload):
+            if first is None:
+                first = time.perf_counter() - start
+        return time.perf_counter() - start, first, None
+    except Exception as e:
+        return time.perf_counter() - start, first, type(e).__name__
+
+
+def run_threads(fn, payloads, concurrency):
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(fn, payloads))
+
+
+def run_batch(payloads, concurrency):
+    results = generate_playbooks(payloads, concurrency=concurrency)
+    return [
+        (r.seconds, None, None if r.ok else r.error.split(":")[0])
+        for r in results
+    ]
+
+
+def percentiles(values):
+    if not values:
+        return "n/a"
+    p50, p90, p99 = np.percentile(values, [50, 90, 99]) * 1000
+    return f"p50={p50:.0f}ms p90={p90:.0f}ms p99={p99:.0f}ms max={max(values) * 1000:.0f}ms"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", choices=["single", "stream", "batch"], default="single")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--base-url", default=None, help="skip the mock and hit this endpoint")
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--tokens-per-second", type=float, default=400.0)
+    parser.add_argument("--retries", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-call budget, retries included")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server = start_mock_server(config=MockConfig(
+            latency=args.latency,
+            error_rate=args.error_rate,
+            error_status=args.error_status,
+            tokens_per_second=args.tokens_per_second,
+        ))
+        base_url = server.base_url
+        os.environ.setdefault("OPENROUTER_API_KEY", "mock")
+
+    # Retries default to 0 so every mock error is visible in the report
+    genai_engine.configure_client(base_url=base_url, timeout=args.timeout, max_retries=args.retries)
+    genai_engine.reset_resilience_counters()
+    payloads = make_payloads(args.requests)
+
+    start = time.perf_counter()
+    if args.mode == "single":
+        rows = run_threads(timed_single, payloads, args.concurrency)
+    elif args.mode == "stream":
+        rows = run_threads(timed_stream, payloads, args.concurrency)
+    else:
+        rows = run_batch(payloads, args.concurrency)
+    elapsed = time.perf_counter() - start
+
+    latencies = [seconds for seconds, _, error in rows if error is None]
+    first_chunks = [first for _, first, error in rows if error is None and first is not None]
+    errors = Counter(error for _, _, error in rows if error is not None)
+
+    print(f"mode={args.mode} requests={len(rows)} concurrency={args.concurrency} endpoint={base_url}")
+    print(f"throughput: {len(rows) / elapsed:.1f} req/s over {elapsed:.2f}s")
+    print(f"latency:    {percentiles(latencies)}")
+    if args.mode == "stream":
+        print(f"first chunk: {percentiles(first_chunks)}")
+    print(f"ok: {len(latencies)}  errors: {dict(errors) or 0}")
+    print(f"resilience: {genai_engine.get_resilience_counters()}")
+    print(format_summary(genai_engine.genai_metrics_summary()))
+    if server is not None:
+        print(f"mock server: {server.requests} requests, {server.errors} injected errors")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
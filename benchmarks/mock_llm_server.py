@@ -0,0 +1,219 @@
+"""
+Local stand-in for an OpenAI-compatible chat completions endpoint.
+
+Serves POST .../chat/completions (plain and stream=True) with configurable
+latency, error rate and token throughput, so genai_engine can be exercised
+without calling OpenRouter.
+
+    python benchmarks/mock_llm_server.py --port 8765 --latency 0.3 --error-rate 0.05
+    OPENROUTER_BASE_URL=http://127.0.0.1:8765/v1 OPENROUTER_API_KEY=mock streamlit run ui/teacher_dashboard.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+PLAYBOOK_TEXT = """### WHY THIS STUDENT IS STRUGGLING
+The student's results trail what their study effort and context predict. The primary lever points to a specific, changeable routine.
+
+### TARGETED INTERVENTION PLAYBOOK
+- Owner: Class teacher
+  Action: Agree a weekly check-in on the primary lever with the student
+  Success Metric: Lever indicator improves for three consecutive weeks
+  Timeframe: 4 weeks
+- Owner: Student
+  Action: Keep a short log of the routine being changed
+  Success Metric: Log completed on at least 5 days per week
+  Timeframe: 4 weeks
+
+### PARENT COMMUNICATION DRAFT
+We have noticed an opportunity to help your child get more out of the effort they already put in, and would like to work on one small routine together."""
+
+
+@dataclass
+class MockConfig:
+    latency: float = 0.2          # seconds before the first token
+    jitter: float = 0.05          # +/- uniform jitter on latency
+    error_rate: float = 0.0       # share of requests answered with an error
+    error_status: int = 503       # 429/500/503 exercise retry paths
+    tokens_per_second: float = 200.0
+    seed: int = 0
+
+
+def _tokens(text: str):
+    # Whitespace-preserving pseudo tokens: one per word
+    words = text.split(" ")
+    return [w + (" " if i < len(words) - 1 else "") for i, w in enumerate(words)]
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    server_version = "MockLLM/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        config: MockConfig = self.server.config
+        with self.server.rng_lock:
+            fail = self.server.rng.random() < config.error_rate
+            delay = max(0.0, config.latency + self.server.rng.uniform(-config.jitter, config.jitter))
+
+        self.server.count_request(fail)
+        time.sleep(delay)
+
+        if fail:
+            self._send_json(
+                config.error_status,
+                {"error": {"message": "mock upstream error", "code": config.error_status}},
+            )
+            return
+
+        prompt_tokens = sum(len(m.get("content", "").split()) for m in request.get("messages", []))
+        tokens = _tokens(PLAYBOOK_TEXT)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(tokens),
+            "total_tokens": prompt_tokens + len(tokens),
+        }
+        model = request.get("model", "mock")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        per_token = 1.0 / config.tokens_per_second if config.tokens_per_second else 0.0
+
+        if request.get("stream"):
+            self._stream(completion_id, model, tokens, per_token, usage, request)
+            return
+
+        time.sleep(per_token * len(tokens))
+        self._send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(tokens)},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        })
+
+    def _stream(self, completion_id, model, tokens, per_token, usage, request):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        def send(body):
+            self.wfile.write(f"data: {json.dumps(body)}\n\n".encode())
+            self.wfile.flush()
+
+        base = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+        }
+
+        for i, token in enumerate(tokens):
+            delta = {"content": token}
+            if i == 0:
+                delta["role"] = "assistant"
+            send(dict(base, choices=[{"index": 0, "delta": delta, "finish_reason": None}]))
+            time.sleep(per_token)
+
+        send(dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}]))
+
+        if request.get("stream_options", {}).get("include_usage"):
+            send(dict(base, choices=[], usage=usage))
+
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config: MockConfig):
+        super().__init__(address, MockLLMHandler)
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.rng_lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def count_request(self, failed: bool) -> None:
+        with self.rng_lock:
+            self.requests += 1
+            self.errors += int(failed)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def start_mock_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    config: MockConfig = None,
+) -> MockLLMServer:
+    """
+    Starts the server on a background thread (port=0 picks a free port).
+    Call server.shutdown() when done.
+    """
+    server = MockLLMServer((host, port), config or MockConfig())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible chat completions server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        tokens_per_second=args.tokens_per_second,
+        seed=args.seed,
+    )
+    server = MockLLMServer((args.host, args.port), config)
+    print(f"Mock LLM listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
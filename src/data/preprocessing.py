@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 
@@ -12,50 +13,139 @@ def add_student_id(df: pd.DataFrame) -> pd.DataFrame:
     # Move Student_ID to the first column position
     cols = ['Student_ID'] + [col for col in df.columns if col != 'Student_ID']
     return df[cols]
+UNUSED_COLUMNS = [
+    "Teacher_Quality",
+    "Parental_Education_Level",
+    "Distance_from_Home",
+]
+
+
 def drop_unused_columns(df: pd.DataFrame) -> pd.DataFrame:
-    return df.drop(
-        columns=[
-            "Teacher_Quality",
-            "Parental_Education_Level",
-            "Distance_from_Home",
-        ]
-    )
+    return df.drop(columns=UNUSED_COLUMNS)
+
+
+ORDINAL_MAPS = {
+    "Parental_Involvement": {"Low": 0, "Medium": 1, "High": 2},
+    "Access_to_Resources": {"Low": 0, "Medium": 1, "High": 2},
+    "Motivation_Level": {"Low": 0, "Medium": 1, "High": 2},
+    "Family_Income": {"Low": 0, "Medium": 1, "High": 2},
+    "Peer_Influence": {"Negative": 0, "Neutral": 1, "Positive": 2},
+}
+
+BINARY_MAPS = {
+    "Internet_Access": {"No": 0, "Yes": 1},
+    "Extracurricular_Activities": {"No": 0, "Yes": 1},
+    "Learning_Disabilities": {"No": 0, "Yes": 1},
+    "Gender": {"Female": 0, "Male": 1},
+    "School_Type": {"Private": 0, "Public": 1}
+}
+
+
+def encode_as_codes(series: pd.Series, mapping: dict) -> pd.Series:
+    """
+    Nullable Int8 codes via pd.Categorical with fixed categories, in mapping
+    order. Missing or unknown values stay missing (<NA>), as the NaN that
+    .map(mapping) gives, rather than a -1 code that would read as an
+    ordinal below the lowest level.
+    """
+    categories = sorted(mapping, key=mapping.get)
+    codes = np.asarray(pd.Categorical(series, categories=categories).codes, dtype="int8")
+    values = pd.arrays.IntegerArray(codes, mask=codes < 0)
+    return pd.Series(values, index=series.index, name=series.name)
 
 
-def encode_ordinal_features(df: pd.DataFrame) -> pd.DataFrame:
+def encode_ordinal_features(
+    df: pd.DataFrame,
+    compact: bool = False,
+) -> pd.DataFrame:
     df = df.copy()
 
-    ordinal_maps = {
-        "Parental_Involvement": {"Low": 0, "Medium": 1, "High": 2},
-        "Access_to_Resources": {"Low": 0, "Medium": 1, "High": 2},
-        "Motivation_Level": {"Low": 0, "Medium": 1, "High": 2},
-        "Family_Income": {"Low": 0, "Medium": 1, "High": 2},
-        "Peer_Influence": {"Negative": 0, "Neutral": 1, "Positive": 2},
-    }
+    for col, mapping in ORDINAL_MAPS.items():
+        if compact:
+            df[col] = encode_as_codes(df[col], mapping)
+        else:
+            df[col] = df[col].map(mapping)
+
+    return df
+
+
+def encode_binary_features(
+    df: pd.DataFrame,
+    compact: bool = False,
+) -> pd.DataFrame:
+    df = df.copy()
 
-    for col, mapping in ordinal_maps.items():
-        df[col] = df[col].map(mapping)
+    for col, mapping in BINARY_MAPS.items():
+        if compact:
+            df[col] = encode_as_codes(df[col], mapping)
+        else:
+            df[col] = df[col].map(mapping)
 
+    df = df.rename(columns={"School_Type": "School_Type_Public"})
     return df
 
 
-def encode_binary_features(df: pd.DataFrame) -> pd.DataFrame:
+def downcast_numeric_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Integer columns that fit become int16, float columns become float32.
+    Int8 code columns are left as they are.
+    """
     df = df.copy()
 
-    binary_maps = {
-        "Internet_Access": {"No": 0, "Yes": 1},
-        "Extracurricular_Activities": {"No": 0, "Yes": 1},
-        "Learning_Disabilities": {"No": 0, "Yes": 1},
-        "Gender": {"Female": 0, "Male": 1},
-        "School_Type": {"Private": 0, "Public": 1}
+    for col in df.select_dtypes(include="integer").columns:
+        values = df[col]
+        if values.dtype.itemsize <= 2:
+            continue
+        if values.min() >= -32768 and values.max() <= 32767:
+            df[col] = values.astype("int16")
+
+    for col in df.select_dtypes(include="floating").columns:
+        df[col] = df[col].astype("float32")
+
+    return df
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> dict:
+    before_bytes = int(before.memory_usage(deep=True).sum())
+    after_bytes = int(after.memory_usage(deep=True).sum())
+
+    return {
+        "before_bytes": before_bytes,
+        "after_bytes": after_bytes,
+        "saved_bytes": before_bytes - after_bytes,
+        "ratio": after_bytes / before_bytes if before_bytes else 1.0,
     }
 
-    for col, mapping in binary_maps.items():
-        df[col] = df[col].map(mapping)
+def preprocess_students(
+    df: pd.DataFrame,
+    inplace: bool = False,
+    compact: bool = False,
+    id_offset: int = 0,
+) -> pd.DataFrame:
+    """
+    Fused add_student_id -> drop_unused_columns -> encode_ordinal_features
+    -> encode_binary_features. Produces the same frame as the chain with at
+    most one frame allocation (the drop); inplace=True reuses the caller's
+    frame instead. id_offset continues Student_ID numbering across chunks.
+    """
+    if inplace:
+        df.drop(columns=UNUSED_COLUMNS, inplace=True)
+    else:
+        df = df.drop(columns=UNUSED_COLUMNS)
+
+    for maps in (ORDINAL_MAPS, BINARY_MAPS):
+        for col, mapping in maps.items():
+            if compact:
+                df[col] = encode_as_codes(df[col], mapping)
+            else:
+                df[col] = df[col].map(mapping)
+
+    df.rename(columns={"School_Type": "School_Type_Public"}, inplace=True)
+    df.insert(0, "Student_ID", [f"STUD{i+1:04d}" for i in range(id_offset, id_offset + len(df))])
 
-    df = df.rename(columns={"School_Type": "School_Type_Public"})
     return df
 
+
 def split_features_target(
     df: pd.DataFrame,
     target_col: str = "Exam_Score",
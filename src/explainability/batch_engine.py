@@ -0,0 +1,175 @@
+# Batch playbook generation for a whole class.
+#
+# Many payloads from build_genai_payload are generated concurrently with a
+# cap on in-flight requests and on request starts per second. Results are
+# yielded as they complete, and a failing student produces an error result
+# instead of failing the batch.
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from src.explainability.genai_engine import (
+    create_async_client,
+    create_completion_async,
+    record_call,
+    validate_input_contract,
+    build_prompt,
+    DEFAULT_MODEL,
+    DEFAULT_TEMPERATURE,
+)
+from src.explainability.metrics import usage_fields
+from src.explainability.response_cache import ResponseCache, response_cache_key
+
+
+@dataclass
+class PlaybookResult:
+    index: int
+    payload: Dict
+    report: Optional[str] = None
+    error: Optional[str] = None
+    seconds: float = 0.0
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class RateLimiter:
+    """
+    Spaces request starts at least 1 / requests_per_second apart.
+    """
+
+    def __init__(self, requests_per_second: Optional[float]):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_start - now
+            self._next_start = max(now, self._next_start) + self.interval
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def _generate_one(
+    client,
+    index: int,
+    payload: Dict,
+    semaphore: asyncio.Semaphore,
+    limiter: RateLimiter,
+    model: str,
+    temperature: float,
+    cache: Optional[ResponseCache],
+) -> PlaybookResult:
+    result = PlaybookResult(index=index, payload=payload)
+
+    try:
+        validate_input_contract(payload)
+        messages = build_prompt(payload)
+    except ValueError as e:
+        result.error = str(e)
+        return result
+
+    metrics = {
+        "operation": "batch",
+        "model": model,
+        "prompt_chars": sum(len(m["content"]) for m in messages),
+        "cache": "off" if cache is None else "miss",
+    }
+
+    if cache is not None:
+        start = time.perf_counter()
+        key = response_cache_key(messages, model, temperature)
+        result.report = cache.get(key)
+        if result.report is not None:
+            result.cached = True
+            result.seconds = time.perf_counter() - start
+            record_call(seconds=result.seconds, **dict(metrics, cache="hit"))
+            return result
+
+    async with semaphore:
+        await limiter.wait()
+        start = time.perf_counter()
+        try:
+            response = await create_completion_async(
+                client,
+                model=model,
+                messages=messages,
+                temperature=temperature,
+            )
+            result.report = response.choices[0].message.content
+            metrics.update(usage_fields(getattr(response, "usage", None)))
+            if cache is not None and result.report:
+                cache.set(key, result.report)
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+            metrics.update(ok=False, error=type(e).__name__)
+        result.seconds = time.perf_counter() - start
+
+    record_call(seconds=result.seconds, **metrics)
+    return result
+
+
+async def generate_playbooks_async(
+    payloads: List[Dict],
+    concurrency: int = 5,
+    requests_per_second: Optional[float] = None,
+    model: str = DEFAULT_MODEL,
+    temperature: float = DEFAULT_TEMPERATURE,
+    cache: Optional[ResponseCache] = None,
+):
+    """
+    Async generator yielding a PlaybookResult per payload, in completion
+    order. result.index is the payload's position in the input list.
+    """
+    client = create_async_client()
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(requests_per_second)
+
+    tasks = [
+        asyncio.create_task(
+            _generate_one(client, i, payload, semaphore, limiter, model, temperature, cache)
+        )
+        for i, payload in enumerate(payloads)
+    ]
+
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await client.close()
+
+
+def generate_playbooks(
+    payloads: List[Dict],
+    concurrency: int = 5,
+    requests_per_second: Optional[float] = None,
+    model: str = DEFAULT_MODEL,
+    temperature: float = DEFAULT_TEMPERATURE,
+    cache: Optional[ResponseCache] = None,
+) -> List[PlaybookResult]:
+    """
+    Blocking wrapper around generate_playbooks_async; results are returned
+    in input order.
+    """
+
+    async def collect():
+        results = [None] * len(payloads)
+        async for result in generate_playbooks_async(
+            payloads, concurrency, requests_per_second, model, temperature, cache
+        ):
+            results[result.index] = result
+        return results
+
+    return asyncio.run(collect())
@@ -1,4 +1,8 @@
 # src/genai/build_payload.py
+import json
+
+import numpy as np
+
 
 def assign_risk_level(gap: float) -> str:
     if gap <= -1.0:
@@ -29,4 +33,78 @@ def build_genai_payload(row: dict) -> dict:
         }
     }
 
-    return payload
\ No newline at end of file
+    return payload
+
+
+def _to_python(value):
+    # numpy scalars -> builtins, so the prompt text does not depend on how
+    # the row was fetched (iterrows vs .iloc) or on the numpy repr
+    if isinstance(value, dict):
+        return {k: _to_python(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_to_python(v) for v in value]
+    return value.item() if hasattr(value, "item") else value
+
+
+def build_student_payload(student_row) -> dict:
+    """
+    Payload for one row of the dashboard feature table (persona label taken
+    from failure_mode_persona). Shared by the Deep Dive view and the nightly
+    precompute job so both produce the same prompt.
+    """
+    input_row = student_row.copy()
+    input_row["persona_label"] = student_row["failure_mode_persona"]
+    return _to_python(build_genai_payload(input_row))
+
+
+KEY_DRIVER_COLS = ["Sleep_Hours", "Attendance", "Hours_Studied"]
+
+
+def build_genai_payloads(df, persona_col: str = "failure_mode_persona") -> list:
+    """
+    Column-wise build_student_payload for a whole feature table (or a
+    filtered slice): one payload per row, in row order, with the same
+    values build_student_payload gives for that row.
+    """
+    gap = df["effort_outcome_gap"].to_numpy(dtype=float)
+    risk = np.select([gap <= -1.0, gap <= -0.5], ["High", "Medium"], default="Low")
+
+    # Per-column tolist keeps each column's own type (an int column stays
+    # int), so the prompt text matches the single-row path
+    drivers = zip(*(df[col].to_numpy().tolist() for col in KEY_DRIVER_COLS))
+
+    return [
+        {
+            "persona_label": persona,
+            "risk_level": risk_level,
+            "effort_outcome_gap": rounded,
+            "primary_lever": lever,
+            "key_drivers": list(key_drivers),
+            "student_context": {
+                "School_Type_Public": school,
+                "learning_disabilities": disabilities,
+            },
+        }
+        for persona, risk_level, rounded, lever, key_drivers, school, disabilities in zip(
+            df[persona_col].tolist(),
+            risk.tolist(),
+            np.round(gap, 2).tolist(),
+            df["primary_lever"].tolist(),
+            drivers,
+            df["School_Type_Public"].to_numpy().tolist(),
+            df["Learning_Disabilities"].to_numpy().tolist(),
+        )
+    ]
+
+
+def write_payloads_jsonl(df, path: str, persona_col: str = "failure_mode_persona") -> int:
+    """
+    Writes {"Student_ID": ..., "payload": {...}} per row. Returns the row count.
+    """
+    payloads = build_genai_payloads(df, persona_col)
+
+    with open(path, "w", encoding="utf-8") as f:
+        for student_id, payload in zip(df["Student_ID"].tolist(), payloads):
+            f.write(json.dumps({"Student_ID": student_id, "payload": payload}, ensure_ascii=False) + "\n")
+
+    return len(payloads)
@@ -1,20 +1,230 @@
 # Autogenerated module
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional
+import importlib.util
 import os
-from openai import OpenAI # pyright: ignore[reportMissingImports]
+import threading
+import time
 from dotenv import load_dotenv # pyright: ignore[reportMissingImports] # Add this import
 
-load_dotenv() # Add this line before the key check
+from src.explainability.response_cache import ResponseCache, response_cache_key
+from src.explainability.metrics import (
+    CallRecord,
+    JsonlSink,
+    RingBufferSink,
+    summarize_calls,
+    usage_fields,
+)
+from src.explainability.resilience import (
+    CircuitBreaker,
+    ResilienceCounters,
+    RetryPolicy,
+    async_call_with_resilience,
+    call_with_resilience,
+)
+
+# -------------------------
+# Lazy Client
+# -------------------------
+# The openai SDK is only imported, and the API key only checked, when a
+# playbook is actually requested, so importing this module is cheap and
+# works on machines without a key.
+#
+# Retries are owned by the resilience layer (backoff, overall deadline,
+# circuit breaker), so the SDK itself is built with max_retries=0 and
+# OPENROUTER_TIMEOUT is the budget for a whole call including retries.
+class GenAIUnavailableError(RuntimeError):
+    pass
 
-OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 
-if not OPENROUTER_API_KEY:
-    raise RuntimeError("OPENROUTER_API_KEY is not set")
+_settings = {
+    "base_url": os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1"),
+    "timeout": float(os.getenv("OPENROUTER_TIMEOUT", "60")),
+    "max_retries": int(os.getenv("OPENROUTER_MAX_RETRIES", "2")),
+}
+_client = None
+_client_lock = threading.Lock()
+_dotenv_loaded = False
 
-client = OpenAI(
-    base_url="https://openrouter.ai/api/v1",
-    api_key=OPENROUTER_API_KEY,
+_breaker = CircuitBreaker(
+    failure_threshold=int(os.getenv("OPENROUTER_BREAKER_THRESHOLD", "5")),
+    reset_timeout=float(os.getenv("OPENROUTER_BREAKER_RESET", "30")),
 )
+_counters = ResilienceCounters()
+
+
+def _retry_policy() -> RetryPolicy:
+    return RetryPolicy(
+        max_attempts=_settings["max_retries"] + 1,
+        deadline=_settings["timeout"],
+    )
+
+
+def _api_key() -> Optional[str]:
+    global _dotenv_loaded
+    if not _dotenv_loaded:
+        load_dotenv()
+        _dotenv_loaded = True
+    return os.getenv("OPENROUTER_API_KEY")
+
+
+def is_genai_available() -> bool:
+    return bool(_api_key()) and importlib.util.find_spec("openai") is not None
+
+
+def configure_client(
+    base_url: Optional[str] = None,
+    timeout: Optional[float] = None,
+    max_retries: Optional[int] = None,
+) -> None:
+    """
+    Overrides client settings; the next get_client() call rebuilds it.
+    timeout is the per-call budget and max_retries the number of retries
+    allowed within it.
+    """
+    global _client
+    with _client_lock:
+        if base_url is not None:
+            _settings["base_url"] = base_url
+        if timeout is not None:
+            _settings["timeout"] = timeout
+        if max_retries is not None:
+            _settings["max_retries"] = max_retries
+        _client = None
+
+
+def configure_circuit_breaker(
+    failure_threshold: Optional[int] = None,
+    reset_timeout: Optional[float] = None,
+) -> None:
+    global _breaker
+    _breaker = CircuitBreaker(
+        failure_threshold=failure_threshold or _breaker.failure_threshold,
+        reset_timeout=reset_timeout if reset_timeout is not None else _breaker.reset_timeout,
+    )
+
+
+def get_resilience_counters() -> Dict:
+    """
+    Process-wide counters for attempts, retries, failures, deadline hits
+    and calls rejected by an open circuit, plus the breaker state.
+    """
+    return dict(_counters.snapshot(), circuit_state=_breaker.state)
+
+
+def reset_resilience_counters() -> None:
+    global _counters
+    _counters = ResilienceCounters()
+
+
+def create_completion(**kwargs):
+    """
+    chat.completions.create on the shared client, with retries, the
+    per-call deadline and the circuit breaker applied.
+    """
+    client = get_client()
+    return call_with_resilience(
+        lambda timeout: client.chat.completions.create(timeout=timeout, **kwargs),
+        _retry_policy(),
+        _breaker,
+        _counters,
+    )
+
+
+async def create_completion_async(client, **kwargs):
+    """
+    Async counterpart of create_completion for an AsyncOpenAI client.
+    """
+    return await async_call_with_resilience(
+        lambda timeout: client.chat.completions.create(timeout=timeout, **kwargs),
+        _retry_policy(),
+        _breaker,
+        _counters,
+    )
+
+
+def _client_kwargs() -> Dict:
+    api_key = _api_key()
+    if not api_key:
+        raise GenAIUnavailableError("OPENROUTER_API_KEY is not set")
+
+    return {
+        "base_url": _settings["base_url"],
+        "api_key": api_key,
+        "timeout": _settings["timeout"],
+        "max_retries": 0,
+    }
+
+
+def get_client():
+    """
+    Shared OpenAI client, created on first use. Its HTTP connection pool
+    is reused across calls and Streamlit sessions.
+    """
+    global _client
+    if _client is not None:
+        return _client
+
+    with _client_lock:
+        if _client is None:
+            kwargs = _client_kwargs()
+            from openai import OpenAI # pyright: ignore[reportMissingImports]
+            _client = OpenAI(**kwargs)
+        return _client
+
+
+def create_async_client():
+    """
+    New AsyncOpenAI client for one batch run. Async connection pools are
+    tied to the event loop that opened them, so these are not shared.
+    """
+    kwargs = _client_kwargs()
+    from openai import AsyncOpenAI # pyright: ignore[reportMissingImports]
+    return AsyncOpenAI(**kwargs)
+
+
+# -------------------------
+# Call Metrics
+# -------------------------
+# One CallRecord per request (timing, token usage, model, cache hit/miss).
+# The ring buffer always holds the most recent calls; set
+# GENAI_METRICS_PATH to also append them to a JSON lines file.
+_recent_calls = RingBufferSink(int(os.getenv("GENAI_METRICS_BUFFER", "1000")))
+_metrics_sinks = [_recent_calls]
+if os.getenv("GENAI_METRICS_PATH"):
+    _metrics_sinks.append(JsonlSink(os.getenv("GENAI_METRICS_PATH")))
+
+
+def add_metrics_sink(sink) -> None:
+    """
+    sink is any object with a record(CallRecord) method.
+    """
+    _metrics_sinks.append(sink)
+
+
+def record_call(**fields) -> None:
+    record = CallRecord(**fields)
+    for sink in _metrics_sinks:
+        try:
+            sink.record(record)
+        except Exception:
+            # Metrics must never fail a playbook request
+            pass
+
+
+def recent_calls() -> List[CallRecord]:
+    return _recent_calls.records()
+
+
+def genai_metrics_summary() -> Dict:
+    return summarize_calls(recent_calls())
+
+
+def _prompt_chars(messages: List[Dict]) -> int:
+    return sum(len(message["content"]) for message in messages)
+
+
+DEFAULT_MODEL = "z-ai/glm-4.5-air:free"
+DEFAULT_TEMPERATURE = 0.2
 
 # -------------------------
 # Required Input Contract
@@ -115,21 +325,131 @@ OUTPUT FORMAT (STRICT):
 # -------------------------
 def generate_teacher_explanation(
     payload: Dict,
-    model: str = "z-ai/glm-4.5-air:free",
-    temperature: float = 0.2,
+    model: str = DEFAULT_MODEL,
+    temperature: float = DEFAULT_TEMPERATURE,
+    cache: Optional[ResponseCache] = None,
 ) -> str:
     """
     Main entry point for Feature 7.
     Returns formatted text ready for teacher UI.
+    With a cache, an identical prompt/model/temperature is served from disk.
     """
 
     validate_input_contract(payload)
     messages = build_prompt(payload)
+    metrics = {"operation": "generate", "model": model, "prompt_chars": _prompt_chars(messages)}
+    start = time.perf_counter()
+
+    cache_state = "off"
+    if cache is not None:
+        key = response_cache_key(messages, model, temperature)
+        cached = cache.get(key)
+        if cached is not None:
+            record_call(cache="hit", seconds=time.perf_counter() - start, **metrics)
+            return cached
+        cache_state = "miss"
+
+    try:
+        response = create_completion(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+        )
+    except Exception as e:
+        record_call(
+            cache=cache_state, seconds=time.perf_counter() - start,
+            ok=False, error=type(e).__name__, **metrics,
+        )
+        raise
+    report = response.choices[0].message.content
+
+    record_call(
+        cache=cache_state, seconds=time.perf_counter() - start,
+        **usage_fields(getattr(response, "usage", None)), **metrics,
+    )
+
+    if cache is not None and report:
+        cache.set(key, report)
+
+    return report
+
+
+def stream_teacher_explanation(
+    payload: Dict,
+    model: str = DEFAULT_MODEL,
+    temperature: float = DEFAULT_TEMPERATURE,
+    cache: Optional[ResponseCache] = None,
+) -> Iterator[str]:
+    """
+    Streaming variant of generate_teacher_explanation: returns an iterator
+    of text chunks as the model produces them. The input contract is
+    checked before anything is sent, and the full text is cached once the
+    stream completes.
+    """
+
+    validate_input_contract(payload)
+    messages = build_prompt(payload)
+    metrics = {"operation": "stream", "model": model, "prompt_chars": _prompt_chars(messages)}
+    start = time.perf_counter()
+
+    key = None
+    cache_state = "off"
+    if cache is not None:
+        key = response_cache_key(messages, model, temperature)
+        cached = cache.get(key)
+        if cached is not None:
+            record_call(cache="hit", seconds=time.perf_counter() - start, **metrics)
+            return iter([cached])
+        cache_state = "miss"
+
+    metrics["cache"] = cache_state
+
+    # Only opening the stream is retried; a stream that breaks midway
+    # raises to the caller, which has already shown partial text
+    try:
+        stream = create_completion(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+    except Exception as e:
+        record_call(seconds=time.perf_counter() - start, ok=False, error=type(e).__name__, **metrics)
+        raise
+
+    return _iter_stream_text(stream, cache, key, start, metrics)
+
+
+def _iter_stream_text(stream, cache, key, start, metrics) -> Iterator[str]:
+    parts = []
+    first_chunk = None
+    usage = None
+
+    try:
+        for chunk in stream:
+            # With include_usage the last chunk has no choices, only usage
+            if getattr(chunk, "usage", None) is not None:
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            text = chunk.choices[0].delta.content
+            if text:
+                if first_chunk is None:
+                    first_chunk = time.perf_counter() - start
+                parts.append(text)
+                yield text
+    except Exception as e:
+        record_call(
+            seconds=time.perf_counter() - start, first_chunk_seconds=first_chunk,
+            ok=False, error=type(e).__name__, **metrics,
+        )
+        raise
 
-    response = client.chat.completions.create(
-        model=model,
-        messages=messages,
-        temperature=temperature,
+    record_call(
+        seconds=time.perf_counter() - start, first_chunk_seconds=first_chunk,
+        **usage_fields(usage), **metrics,
     )
 
-    return response.choices[0].message.content
\ No newline at end of file
+    if cache is not None and parts:
+        cache.set(key, "".join(parts))
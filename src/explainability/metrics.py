@@ -0,0 +1,168 @@
+# Per-call metrics for the GenAI path.
+#
+# genai_engine and batch_engine emit one CallRecord per playbook request:
+# wall time (and time to first chunk when streaming), token usage reported
+# by the API, model, and whether the response cache answered. Records go to
+# an in-memory ring buffer and, when GENAI_METRICS_PATH is set, to a JSON
+# lines file. summarize_calls() turns either into a quota/latency report:
+#
+#   python src/explainability/metrics.py --log .cache/genai_calls.jsonl
+import argparse
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+@dataclass
+class CallRecord:
+    operation: str                      # "generate", "stream" or "batch"
+    model: str
+    cache: str                          # "hit", "miss" or "off"
+    seconds: float
+    ok: bool = True
+    first_chunk_seconds: Optional[float] = None
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    total_tokens: Optional[int] = None
+    prompt_chars: int = 0
+    error: Optional[str] = None
+    timestamp: float = field(default_factory=time.time)
+
+
+def usage_fields(usage) -> Dict:
+    """
+    Token counts from an OpenAI usage object (None when not reported).
+    """
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", None),
+        "completion_tokens": getattr(usage, "completion_tokens", None),
+        "total_tokens": getattr(usage, "total_tokens", None),
+    }
+
+
+class RingBufferSink:
+    def __init__(self, maxlen: int = 1000):
+        self._records = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def record(self, record: CallRecord) -> None:
+        with self._lock:
+            self._records.append(record)
+
+    def records(self) -> List[CallRecord]:
+        with self._lock:
+            return list(self._records)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+
+
+class JsonlSink:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def record(self, record: CallRecord) -> None:
+        line = json.dumps(asdict(record), ensure_ascii=False)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def read_jsonl_records(path: str) -> List[CallRecord]:
+    with open(path, encoding="utf-8") as f:
+        return [CallRecord(**json.loads(line)) for line in f if line.strip()]
+
+
+def _percentiles(values) -> Optional[Dict]:
+    if not values:
+        return None
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {"p50": float(p50), "p90": float(p90), "p99": float(p99), "max": float(max(values))}
+
+
+def summarize_calls(records: List[CallRecord]) -> Dict:
+    """
+    Call counts, cache hit rate, latency percentiles split by cache hit and
+    LLM call, and token totals/means per model.
+    """
+    llm_calls = [r for r in records if r.cache != "hit"]
+    hits = [r for r in records if r.cache == "hit"]
+    looked_up = [r for r in records if r.cache != "off"]
+
+    by_model = {}
+    for model in sorted({r.model for r in llm_calls}):
+        calls = [r for r in llm_calls if r.model == model]
+        with_usage = [r for r in calls if r.prompt_tokens is not None]
+        prompt = sum(r.prompt_tokens for r in with_usage)
+        completion = sum(r.completion_tokens or 0 for r in with_usage)
+        by_model[model] = {
+            "calls": len(calls),
+            "errors": sum(not r.ok for r in calls),
+            "prompt_tokens": prompt,
+            "completion_tokens": completion,
+            "mean_prompt_tokens": prompt / len(with_usage) if with_usage else None,
+            "mean_completion_tokens": completion / len(with_usage) if with_usage else None,
+        }
+
+    return {
+        "calls": len(records),
+        "llm_calls": len(llm_calls),
+        "cache_hits": len(hits),
+        "cache_hit_rate": len(hits) / len(looked_up) if looked_up else None,
+        "errors": sum(not r.ok for r in records),
+        "llm_seconds": _percentiles([r.seconds for r in llm_calls if r.ok]),
+        "first_chunk_seconds": _percentiles(
+            [r.first_chunk_seconds for r in llm_calls if r.ok and r.first_chunk_seconds is not None]
+        ),
+        "cache_hit_seconds": _percentiles([r.seconds for r in hits]),
+        "by_model": by_model,
+    }
+
+
+def format_summary(summary: Dict) -> str:
+    def ms(p):
+        if p is None:
+            return "n/a"
+        return f"p50={p['p50'] * 1000:.0f}ms p90={p['p90'] * 1000:.0f}ms p99={p['p99'] * 1000:.0f}ms"
+
+    hit_rate = summary["cache_hit_rate"]
+    lines = [
+        f"calls: {summary['calls']} ({summary['llm_calls']} LLM, {summary['cache_hits']} cache hits, "
+        f"{summary['errors']} errors)",
+        f"cache hit rate: {'n/a' if hit_rate is None else f'{hit_rate:.0%}'}",
+        f"LLM latency:    {ms(summary['llm_seconds'])}",
+        f"first chunk:    {ms(summary['first_chunk_seconds'])}",
+        f"cache hit:      {ms(summary['cache_hit_seconds'])}",
+    ]
+    for model, stats in summary["by_model"].items():
+        mean_prompt = stats["mean_prompt_tokens"]
+        mean_completion = stats["mean_completion_tokens"]
+        lines.append(
+            f"{model}: {stats['calls']} calls, {stats['prompt_tokens']} prompt + "
+            f"{stats['completion_tokens']} completion tokens"
+            + (f" (mean {mean_prompt:.0f} + {mean_completion:.0f})" if mean_prompt is not None else "")
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize GenAI call metrics.")
+    parser.add_argument("--log", default=os.getenv("GENAI_METRICS_PATH", ".cache/genai_calls.jsonl"))
+    args = parser.parse_args()
+
+    print(format_summary(summarize_calls(read_jsonl_records(args.log))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# Deduplication of equivalent GenAI payloads.
+#
+# build_genai_payload reduces a student to a handful of fields, so students
+# in the same persona/lever bucket often produce the same prompt. Payloads
+# are canonicalized (optionally bucketing the numeric key_drivers), grouped,
+# generated once per group and fanned back out to every student. Bucketing
+# only decides the grouping: the prompt sent for a group carries the group's
+# median (median_low, so a value some student actually has) drivers and gap,
+# never the bucket edges.
+import json
+import math
+import statistics
+from dataclasses import replace
+from typing import Dict, List, Optional, Sequence
+
+from src.explainability.batch_engine import PlaybookResult, generate_playbooks
+
+
+def _native(value):
+    # numpy scalars -> plain Python, so equal values hash equally
+    return value.item() if hasattr(value, "item") else value
+
+
+def bucket_value(value, width: Optional[float]):
+    value = _native(value)
+    if not width or value is None or (isinstance(value, float) and math.isnan(value)):
+        return value
+    bucketed = math.floor(value / width) * width
+    return int(bucketed) if float(bucketed).is_integer() else bucketed
+
+
+def canonicalize_payload(
+    payload: Dict,
+    driver_buckets: Optional[Sequence[float]] = None,
+    gap_bucket: Optional[float] = None,
+) -> Dict:
+    """
+    Plain-Python copy of the payload. driver_buckets gives one bucket width
+    per key_driver (Sleep_Hours, Attendance, Hours_Studied); e.g. (1, 5, 2)
+    maps Attendance 83 -> 80 and Hours_Studied 23 -> 22. gap_bucket does
+    the same for effort_outcome_gap, which otherwise keeps 2 decimals.
+    """
+    drivers = [_native(v) for v in payload["key_drivers"]]
+    if driver_buckets is not None:
+        drivers = [bucket_value(v, w) for v, w in zip(drivers, driver_buckets)]
+
+    canonical = {key: _native(value) for key, value in payload.items()}
+    canonical["key_drivers"] = drivers
+    if gap_bucket is not None:
+        canonical["effort_outcome_gap"] = bucket_value(
+            canonical["effort_outcome_gap"], gap_bucket
+        )
+    canonical["student_context"] = {
+        key: _native(value) for key, value in payload["student_context"].items()
+    }
+
+    return canonical
+
+
+def payload_group_key(payload: Dict) -> str:
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def representative_payload(payloads: List[Dict]) -> Dict:
+    """
+    Payload standing in for a group: the first member's fields, with each
+    key_driver and the gap replaced by the members' median_low.
+    """
+    members = [canonicalize_payload(payload) for payload in payloads]
+    representative = dict(members[0])
+
+    representative["key_drivers"] = [
+        statistics.median_low(values)
+        for values in zip(*(member["key_drivers"] for member in members))
+    ]
+    representative["effort_outcome_gap"] = statistics.median_low(
+        member["effort_outcome_gap"] for member in members
+    )
+
+    return representative
+
+
+def group_payloads(
+    payloads: List[Dict],
+    driver_buckets: Optional[Sequence[float]] = None,
+    gap_bucket: Optional[float] = None,
+) -> List[Dict]:
+    """
+    One entry per distinct canonical (bucketed) payload, in first-seen
+    order: {"payload": representative payload to send, "indices":
+    positions in payloads}.
+    """
+    groups = {}
+    for i, payload in enumerate(payloads):
+        canonical = canonicalize_payload(payload, driver_buckets, gap_bucket)
+        groups.setdefault(payload_group_key(canonical), []).append(i)
+
+    return [
+        {
+            "payload": representative_payload([payloads[i] for i in indices]),
+            "indices": indices,
+        }
+        for indices in groups.values()
+    ]
+
+
+def dedup_stats_line(stats: Dict) -> str:
+    return (
+        f"{stats['payloads']} payloads -> {stats['unique']} unique prompts "
+        f"({stats['calls_saved']} LLM calls saved, {stats['saved_ratio']:.0%})"
+    )
+
+
+def generate_playbooks_deduplicated(
+    payloads: List[Dict],
+    driver_buckets: Optional[Sequence[float]] = None,
+    gap_bucket: Optional[float] = None,
+    **batch_kwargs,
+):
+    """
+    Generates one playbook per group via generate_playbooks and returns
+    (results aligned with payloads, stats). Every student in a group gets
+    the group's report (or error); result.payload is the student's own
+    payload.
+    """
+    groups = group_payloads(payloads, driver_buckets, gap_bucket)
+    group_results = generate_playbooks(
+        [group["payload"] for group in groups],
+        **batch_kwargs,
+    )
+
+    results: List[PlaybookResult] = [None] * len(payloads)
+    for group, group_result in zip(groups, group_results):
+        for i in group["indices"]:
+            results[i] = replace(group_result, index=i, payload=payloads[i])
+
+    stats = {
+        "payloads": len(payloads),
+        "unique": len(groups),
+        "calls_saved": len(payloads) - len(groups),
+        "saved_ratio": (len(payloads) - len(groups)) / len(payloads) if payloads else 0.0,
+    }
+
+    return results, stats
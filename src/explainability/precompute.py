@@ -0,0 +1,237 @@
+# Nightly precompute of playbooks for the highest-risk students.
+#
+# Students are picked from the finished feature table by effort_outcome_gap_z
+# (threshold and/or top-k, in the same order as the dashboard's "Top Priority
+# Students" table). Their payloads go onto a work queue drained by a few
+# worker threads, and each report is stored per student together with the
+# prompt key it was generated from. The Deep Dive view reads the store first;
+# a student whose features have changed since the run no longer matches the
+# stored key and falls back to a live call.
+#
+#   python src/explainability/precompute.py --top-k 50
+#   python src/explainability/precompute.py --features student_features.csv --threshold -1.0
+#
+# Without --features the dashboard's most recent cached feature table is used.
+import argparse
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from typing import Optional
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from src.explainability.build_payload import build_genai_payloads
+from src.explainability.genai_engine import (
+    build_prompt,
+    generate_teacher_explanation,
+    DEFAULT_MODEL,
+    DEFAULT_TEMPERATURE,
+)
+from src.explainability.response_cache import response_cache_key
+from src.pipeline.cache import DEFAULT_CACHE_DIR, latest_cache_entry
+
+
+DEFAULT_STORE_PATH = ".cache/precomputed_playbooks.sqlite"
+DEFAULT_GAP_THRESHOLD = -1.0
+
+
+def playbook_key(
+    payload: dict,
+    model: str = DEFAULT_MODEL,
+    temperature: float = DEFAULT_TEMPERATURE,
+) -> str:
+    return response_cache_key(build_prompt(payload), model, temperature)
+
+
+class PlaybookStore:
+    """
+    Latest precomputed playbook per student. get() only returns a report
+    whose key matches the caller's current payload.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS playbooks ("
+                " student_id TEXT PRIMARY KEY,"
+                " key TEXT NOT NULL,"
+                " report TEXT NOT NULL,"
+                " model TEXT NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, student_id, key: str) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT report FROM playbooks WHERE student_id = ? AND key = ?",
+                (str(student_id), key),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, student_id, key: str, report: str, model: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO playbooks VALUES (?, ?, ?, ?, ?)",
+                (str(student_id), key, report, model, time.time()),
+            )
+
+    def keys(self) -> dict:
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT student_id, key FROM playbooks"))
+
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM playbooks").fetchone()[0]
+
+
+def select_priority_students(
+    df: pd.DataFrame,
+    gap_threshold: Optional[float] = None,
+    top_k: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Students with effort_outcome_gap_z <= gap_threshold, most negative
+    first, limited to top_k. Either criterion may be None; with neither,
+    DEFAULT_GAP_THRESHOLD applies.
+    """
+    if gap_threshold is None and top_k is None:
+        gap_threshold = DEFAULT_GAP_THRESHOLD
+
+    selected = df.sort_values("effort_outcome_gap_z", kind="stable")
+    if gap_threshold is not None:
+        selected = selected[selected["effort_outcome_gap_z"] <= gap_threshold]
+    if top_k is not None:
+        selected = selected.head(top_k)
+    return selected
+
+
+def precompute_playbooks(
+    df: pd.DataFrame,
+    store: PlaybookStore,
+    gap_threshold: Optional[float] = None,
+    top_k: Optional[int] = None,
+    workers: int = 4,
+    model: str = DEFAULT_MODEL,
+    temperature: float = DEFAULT_TEMPERATURE,
+    refresh: bool = False,
+) -> dict:
+    """
+    Generates and stores playbooks for the selected students. Students
+    whose stored playbook still matches their payload are skipped unless
+    refresh=True. A failed student is counted and left for the next run.
+    """
+    selected = select_priority_students(df, gap_threshold, top_k)
+    stored = {} if refresh else store.keys()
+
+    jobs = queue.Queue()
+    skipped = 0
+    for student_id, payload in zip(selected["Student_ID"].tolist(), build_genai_payloads(selected)):
+        key = playbook_key(payload, model, temperature)
+        if stored.get(str(student_id)) == key:
+            skipped += 1
+            continue
+        jobs.put((student_id, payload, key))
+
+    queued = jobs.qsize()
+    counts = {"generated": 0, "failed": 0}
+    errors = []
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            try:
+                student_id, payload, key = jobs.get_nowait()
+            except queue.Empty:
+                return
+
+            try:
+                report = generate_teacher_explanation(payload, model, temperature)
+                if not report:
+                    raise ValueError("empty response")
+                store.put(student_id, key, report, model)
+                outcome = "generated"
+            except Exception as e:
+                outcome = "failed"
+                with lock:
+                    errors.append((student_id, f"{type(e).__name__}: {e}"))
+
+            with lock:
+                counts[outcome] += 1
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, workers))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return {
+        "selected": len(selected),
+        "skipped": skipped,
+        "queued": queued,
+        "generated": counts["generated"],
+        "failed": counts["failed"],
+        "errors": errors,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def load_feature_table(path: str) -> pd.DataFrame:
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute playbooks for high-risk students.")
+    parser.add_argument("--features", default=None, help="scored feature table (.csv or .parquet)")
+    parser.add_argument("--cache-dir", default=os.getenv("FEATURE_CACHE_DIR", DEFAULT_CACHE_DIR))
+    parser.add_argument("--store", default=os.getenv("PRECOMPUTED_PLAYBOOKS_PATH", DEFAULT_STORE_PATH))
+    parser.add_argument("--threshold", type=float, default=None, help=f"effort_outcome_gap_z cut-off (default {DEFAULT_GAP_THRESHOLD} unless --top-k is given)")
+    parser.add_argument("--top-k", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--refresh", action="store_true", help="regenerate up-to-date entries too")
+    args = parser.parse_args()
+
+    features = args.features or latest_cache_entry(args.cache_dir)
+    if features is None:
+        parser.error(f"no --features given and no cached feature table in {args.cache_dir}")
+
+    df = load_feature_table(features)
+    store = PlaybookStore(args.store)
+
+    summary = precompute_playbooks(
+        df,
+        store,
+        gap_threshold=args.threshold,
+        top_k=args.top_k,
+        workers=args.workers,
+        model=args.model,
+        refresh=args.refresh,
+    )
+
+    for student_id, error in summary["errors"]:
+        print(f"⚠️ Student {student_id}: {error}")
+    print(
+        f"✅ {summary['generated']} generated, {summary['skipped']} up to date, "
+        f"{summary['failed']} failed out of {summary['selected']} selected "
+        f"in {summary['seconds']:.1f}s → {args.store}"
+    )
+
+
+if __name__ == "__main__":
+    main()
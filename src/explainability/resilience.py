@@ -0,0 +1,239 @@
+# Resilience layer around LLM calls.
+#
+# Every call gets an overall deadline; retryable failures (timeouts,
+# connection errors, 408/409/429/5xx) are retried with jittered exponential
+# backoff inside that deadline; and a circuit breaker rejects calls outright
+# after repeated failures so Streamlit workers are not parked on a dead
+# upstream. Counters are kept for attempts, retries and rejections.
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict
+
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class DeadlineExceededError(TimeoutError):
+    pass
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    deadline: float = 45.0  # seconds for the whole call, retries included
+
+    def backoff(self, attempt: int) -> float:
+        # "Equal jitter": half fixed, half random, capped at max_delay
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+
+@dataclass
+class ResilienceCounters:
+    attempts: int = 0
+    retries: int = 0
+    successes: int = 0
+    failures: int = 0
+    deadline_exceeded: int = 0
+    circuit_rejections: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "attempts": self.attempts,
+                "retries": self.retries,
+                "successes": self.successes,
+                "failures": self.failures,
+                "deadline_exceeded": self.deadline_exceeded,
+                "circuit_rejections": self.circuit_rejections,
+            }
+
+
+class CircuitBreaker:
+    """
+    closed -> open after failure_threshold consecutive failures; after
+    reset_timeout one trial call is let through (half-open), which closes
+    the circuit on success or re-opens it on failure. Every exit path of a
+    call resolves or releases the trial slot.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def release(self) -> None:
+        """
+        Frees the half-open trial slot without judging the upstream, e.g.
+        when the trial call was cancelled.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+
+def is_retryable(exc: Exception) -> bool:
+    status = getattr(exc, "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+
+    try:
+        import openai # pyright: ignore[reportMissingImports]
+    except ImportError:
+        return isinstance(exc, (TimeoutError, ConnectionError))
+
+    return isinstance(
+        exc,
+        (openai.APITimeoutError, openai.APIConnectionError, TimeoutError, ConnectionError),
+    )
+
+
+def _before_attempt(policy, breaker, counters, started, attempt):
+    # Deadline first: allow() may hand out the half-open trial slot, and a
+    # call that gives up before making a request must not hold on to it
+    remaining = policy.deadline - (time.monotonic() - started)
+    if remaining <= 0:
+        counters.incr("deadline_exceeded")
+        raise DeadlineExceededError(f"GenAI call exceeded its {policy.deadline:.0f}s budget")
+
+    if not breaker.allow():
+        counters.incr("circuit_rejections")
+        raise CircuitOpenError("GenAI service is temporarily unavailable (circuit open)")
+
+    counters.incr("attempts")
+    if attempt > 1:
+        counters.incr("retries")
+
+    return remaining
+
+
+def _after_failure(exc, policy, breaker, counters, started, attempt):
+    """
+    Returns the backoff delay before the next attempt, or re-raises.
+    """
+    retryable = is_retryable(exc)
+    if retryable:
+        breaker.record_failure()
+    else:
+        # The upstream answered (e.g. a 400 for this request), so it counts
+        # as healthy for the circuit and releases a half-open trial
+        breaker.record_success()
+    counters.incr("failures")
+
+    if not retryable or attempt >= policy.max_attempts:
+        raise exc
+
+    delay = policy.backoff(attempt)
+    remaining = policy.deadline - (time.monotonic() - started)
+    if delay >= remaining:
+        counters.incr("deadline_exceeded")
+        raise exc
+
+    return delay
+
+
+def call_with_resilience(
+    fn,
+    policy: RetryPolicy,
+    breaker: CircuitBreaker,
+    counters: ResilienceCounters,
+):
+    """
+    fn(timeout=<seconds left in the budget>) is called until it succeeds,
+    fails with a non-retryable error, or runs out of attempts/time.
+    """
+    started = time.monotonic()
+
+    for attempt in range(1, policy.max_attempts + 1):
+        remaining = _before_attempt(policy, breaker, counters, started, attempt)
+        try:
+            result = fn(timeout=remaining)
+        except Exception as exc:
+            time.sleep(_after_failure(exc, policy, breaker, counters, started, attempt))
+            continue
+        except BaseException:
+            breaker.release()
+            raise
+
+        breaker.record_success()
+        counters.incr("successes")
+        return result
+
+
+async def async_call_with_resilience(
+    fn,
+    policy: RetryPolicy,
+    breaker: CircuitBreaker,
+    counters: ResilienceCounters,
+):
+    """
+    Async counterpart of call_with_resilience; fn returns an awaitable.
+    """
+    started = time.monotonic()
+
+    for attempt in range(1, policy.max_attempts + 1):
+        remaining = _before_attempt(policy, breaker, counters, started, attempt)
+        try:
+            result = await fn(timeout=remaining)
+        except Exception as exc:
+            await asyncio.sleep(_after_failure(exc, policy, breaker, counters, started, attempt))
+            continue
+        except BaseException:
+            # e.g. asyncio.CancelledError when a batch consumer stops early
+            breaker.release()
+            raise
+
+        breaker.record_success()
+        counters.incr("successes")
+        return result
@@ -0,0 +1,112 @@
+# Disk-backed cache for generated playbooks.
+#
+# Keyed by a canonical hash of the prompt messages from build_prompt, the
+# model name and the temperature, so an unchanged payload never reaches the
+# LLM twice. Entries expire after ttl_seconds, and the least recently used
+# ones are evicted beyond max_entries. SQLite keeps it safe to share across
+# Streamlit sessions and worker threads.
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+
+DEFAULT_CACHE_PATH = ".cache/playbooks.sqlite"
+
+
+def response_cache_key(
+    messages: List[Dict],
+    model: str,
+    temperature: float,
+) -> str:
+    canonical = json.dumps(
+        {"messages": messages, "model": model, "temperature": temperature},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        max_entries: int = 1000,
+        ttl_seconds: Optional[float] = 7 * 24 * 3600,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_last_access"
+                " ON responses (last_access)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, created_at = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+
+            conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?",
+                (now, key),
+            )
+
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            if self.ttl_seconds is not None:
+                conn.execute(
+                    "DELETE FROM responses WHERE created_at < ?",
+                    (now - self.ttl_seconds,),
+                )
+            conn.execute(
+                "DELETE FROM responses WHERE key NOT IN ("
+                " SELECT key FROM responses ORDER BY last_access DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
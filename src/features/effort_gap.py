@@ -1,6 +1,85 @@
 # Autogenerated module
+from dataclasses import dataclass
+
+import numpy as np
 import pandas as pd
 
+from src.models.fused_scorer import predict_fused
+
+
+@dataclass
+class GapStatistics:
+    """
+    Online (Welford/Chan) mean and variance of effort_outcome_gap.
+    Chunks can be folded in one at a time and partial results from
+    parallel workers combined with merge(). NaN gaps are skipped, as
+    pandas does.
+    """
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def update(self, gaps) -> "GapStatistics":
+        gaps = np.asarray(gaps, dtype=float)
+        gaps = gaps[~np.isnan(gaps)]
+        if len(gaps) == 0:
+            return self
+
+        batch = GapStatistics(
+            count=len(gaps),
+            mean=float(gaps.mean()),
+            m2=float(np.square(gaps - gaps.mean()).sum()),
+        )
+        merged = self.merge(batch)
+
+        self.count, self.mean, self.m2 = merged.count, merged.mean, merged.m2
+        return self
+
+    def merge(self, other: "GapStatistics") -> "GapStatistics":
+        count = self.count + other.count
+        if count == 0:
+            return GapStatistics()
+
+        delta = other.mean - self.mean
+        mean = self.mean + delta * other.count / count
+        m2 = self.m2 + other.m2 + delta ** 2 * self.count * other.count / count
+
+        return GapStatistics(count=count, mean=mean, m2=m2)
+
+    @property
+    def std(self) -> float:
+        # ddof=1, matching pandas Series.std
+        if self.count < 2:
+            return float("nan")
+        return float(np.sqrt(self.m2 / (self.count - 1)))
+
+
+def add_gap_columns(
+    df: pd.DataFrame,
+    predicted,
+    mean_gap=None,
+    std_gap=None,
+) -> pd.DataFrame:
+    """
+    mean_gap/std_gap default to this frame's statistics; pass them in to
+    normalize a chunk against statistics of the full dataset.
+    """
+    df = df.copy()
+    df["predicted_exam_score"] = predicted
+    df["effort_outcome_gap"] = df["Exam_Score"] - predicted
+
+    if mean_gap is None:
+        mean_gap = df["effort_outcome_gap"].mean()
+    if std_gap is None:
+        std_gap = df["effort_outcome_gap"].std()
+
+    df["effort_outcome_gap_z"] = (
+        (df["effort_outcome_gap"] - mean_gap) /(std_gap + 1e-9)
+    )
+
+    return df
+
 
 def compute_effort_outcome_gap(
     df: pd.DataFrame,
@@ -13,15 +92,53 @@ def compute_effort_outcome_gap(
 
     predicted = model.predict(X_scaled)
 
-    df = df.copy()
-    df["predicted_exam_score"] = predicted
-    df["effort_outcome_gap"] = df["Exam_Score"] - predicted
+    return add_gap_columns(df, predicted)
 
-    mean_gap = df["effort_outcome_gap"].mean()
-    std_gap = df["effort_outcome_gap"].std()
 
-    df["effort_outcome_gap_z"] = (
-        (df["effort_outcome_gap"] - mean_gap) /(std_gap + 1e-9)
-    )
+def compute_effort_outcome_gap_fused(
+    df: pd.DataFrame,
+    scorer: dict,
+):
+    """
+    Same output as compute_effort_outcome_gap, scored with a fused
+    scorer from src.models.fused_scorer (no scikit-learn needed).
+    """
+    predicted = predict_fused(scorer, df)
 
-    return df
+    return add_gap_columns(df, predicted)
+
+
+def accumulate_gap_statistics(
+    df: pd.DataFrame,
+    model,
+    scaler,
+    feature_cols,
+    stats: GapStatistics = None,
+) -> GapStatistics:
+    """
+    Phase 1: folds this chunk's gaps into stats (a new accumulator when
+    None) without emitting any z-scores.
+    """
+    if stats is None:
+        stats = GapStatistics()
+
+    predicted = model.predict(scaler.transform(df[feature_cols]))
+    gaps = df["Exam_Score"].to_numpy(dtype=float) - predicted
+
+    return stats.update(gaps)
+
+
+def normalize_effort_outcome_gap(
+    df: pd.DataFrame,
+    model,
+    scaler,
+    feature_cols,
+    stats: GapStatistics,
+):
+    """
+    Phase 2: gap columns for this chunk, z-scored against the statistics
+    accumulated over the whole dataset.
+    """
+    predicted = model.predict(scaler.transform(df[feature_cols]))
+
+    return add_gap_columns(df, predicted, mean_gap=stats.mean, std_gap=stats.std)
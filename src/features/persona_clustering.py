@@ -1,4 +1,5 @@
 # Autogenerated module
+import numpy as np
 import pandas as pd
 from sklearn.preprocessing import StandardScaler
 from sklearn.cluster import KMeans
@@ -35,6 +36,198 @@ def assign_persona_clusters(
     return df, kmeans
 
 
+def build_persona_artifacts(
+    cluster_scaler,
+    kmeans,
+    feature_cols,
+) -> dict:
+    """
+    Everything needed to label students without refitting: the clustering
+    scaler's mean/scale, the KMeans centroids (in scaled space) and the
+    cluster sizes used to weight incremental updates.
+    """
+    centroids = np.asarray(kmeans.cluster_centers_, dtype=float)
+
+    return {
+        "feature_cols": list(feature_cols),
+        "mean": np.asarray(cluster_scaler.mean_, dtype=float),
+        "scale": np.asarray(cluster_scaler.scale_, dtype=float),
+        "centroids": centroids,
+        "counts": np.bincount(kmeans.labels_, minlength=len(centroids)),
+    }
+
+
+def save_persona_artifacts(
+    artifacts: dict,
+    path: str = "models/persona_centroids.npz",
+) -> None:
+    np.savez(
+        path,
+        feature_cols=np.array(artifacts["feature_cols"]),
+        mean=artifacts["mean"],
+        scale=artifacts["scale"],
+        centroids=artifacts["centroids"],
+        counts=artifacts["counts"],
+    )
+
+
+def load_persona_artifacts(path: str = "models/persona_centroids.npz") -> dict:
+    with np.load(path, allow_pickle=False) as data:
+        return {
+            "feature_cols": data["feature_cols"].tolist(),
+            "mean": data["mean"],
+            "scale": data["scale"],
+            "centroids": data["centroids"],
+            "counts": data["counts"],
+        }
+
+
+def scale_cluster_features(df: pd.DataFrame, artifacts: dict):
+    features = df.assign(
+        gap_for_clustering=df["effort_outcome_gap_z"].clip(-3, 3)
+    )[artifacts["feature_cols"]]
+
+    X = features.to_numpy(dtype=float)
+    return (X - artifacts["mean"]) / artifacts["scale"]
+
+
+def nearest_centroid(X_scaled, centroids):
+    """
+    Nearest centroid per row, or -1 for rows with a non-finite feature
+    (their distances are all NaN and argmin would silently return 0).
+    """
+    distances = (
+        np.square(X_scaled).sum(axis=1)[:, None]
+        - 2 * X_scaled @ centroids.T
+        + np.square(centroids).sum(axis=1)[None, :]
+    )
+    labels = distances.argmin(axis=1).astype(np.int32)
+    labels[~np.isfinite(X_scaled).all(axis=1)] = -1
+    return labels
+
+
+def cluster_column(labels):
+    # Nullable Int32: unassignable students get <NA>, and so no persona
+    return pd.arrays.IntegerArray(labels, mask=labels < 0)
+
+
+def assign_nearest_persona(
+    df: pd.DataFrame,
+    artifacts: dict,
+):
+    """
+    Labels students by nearest persisted centroid, one vectorized distance
+    computation for the whole frame. Same Cluster ids as the fitted KMeans;
+    students with a missing clustering feature get a missing Cluster.
+    """
+    X_scaled = scale_cluster_features(df, artifacts)
+
+    df = df.copy()
+    df["Cluster"] = cluster_column(nearest_centroid(X_scaled, artifacts["centroids"]))
+
+    return df
+
+
+def _add_to_clusters(sums, counts, X_scaled, centroids, sign: int = 1) -> None:
+    """
+    Adds (sign=1) or removes (sign=-1) rows from per-cluster sums/counts,
+    each row going to its nearest centroid. Non-finite rows are skipped.
+    """
+    labels = nearest_centroid(X_scaled, centroids)
+    valid = labels >= 0
+    np.add.at(sums, labels[valid], sign * X_scaled[valid])
+    counts += sign * np.bincount(labels[valid], minlength=len(centroids))
+
+
+def recluster_personas(
+    df: pd.DataFrame,
+    artifacts: dict,
+    mode: str = "warm",
+    changed_mask=None,
+    previous_rows: pd.DataFrame = None,
+    added_mask=None,
+    max_iter: int = 300,
+):
+    """
+    Incremental refresh of persisted personas. The persisted scaler is kept
+    so old and new centroids live in the same space and Cluster ids (and
+    the persona_map names) stay stable.
+
+    mode="warm": full KMeans seeded from the previous centroids, one init.
+    mode="minibatch": one online k-means pass over the affected rows only,
+    weighting previous centroids by their cluster sizes:
+      - changed_mask marks students whose features were updated;
+        previous_rows holds their old feature values (same order as
+        df[changed_mask]) so their old contribution is removed before the
+        new one is added and counts stay equal to the roster size. The old
+        contribution is attributed to its nearest previous centroid.
+      - added_mask marks students new since the artifacts were built.
+
+    Returns (df with Cluster, updated artifacts, report). The report holds
+    the iteration count and how far each centroid moved (scaled units).
+    """
+    X_scaled = scale_cluster_features(df, artifacts)
+    previous = artifacts["centroids"]
+
+    if mode == "warm":
+        finite = np.isfinite(X_scaled).all(axis=1)
+        kmeans = KMeans(
+            n_clusters=len(previous),
+            init=previous,
+            n_init=1,
+            max_iter=max_iter,
+        ).fit(X_scaled[finite])
+
+        centroids = kmeans.cluster_centers_
+        counts = np.bincount(kmeans.labels_, minlength=len(previous))
+        n_iter = int(kmeans.n_iter_)
+
+    elif mode == "minibatch":
+        if changed_mask is None and added_mask is None:
+            raise ValueError("mode='minibatch' needs changed_mask and/or added_mask")
+
+        counts = np.asarray(artifacts["counts"], dtype=np.int64).copy()
+        sums = previous * counts[:, None]
+
+        if changed_mask is not None:
+            changed_mask = np.asarray(changed_mask, dtype=bool)
+            if previous_rows is None or len(previous_rows) != changed_mask.sum():
+                raise ValueError("changed_mask needs previous_rows with the old values of those rows")
+            _add_to_clusters(sums, counts, scale_cluster_features(previous_rows, artifacts), previous, -1)
+            _add_to_clusters(sums, counts, X_scaled[changed_mask], previous)
+
+        if added_mask is not None:
+            _add_to_clusters(sums, counts, X_scaled[np.asarray(added_mask, dtype=bool)], previous)
+
+        counts = np.maximum(counts, 0)
+        # A cluster emptied by the update keeps its previous centroid
+        centroids = np.where(
+            counts[:, None] > 0,
+            sums / np.maximum(counts, 1)[:, None],
+            previous,
+        )
+        n_iter = 1
+
+    else:
+        raise ValueError(f"Unknown recluster mode: {mode}")
+
+    shift = np.linalg.norm(centroids - previous, axis=1)
+
+    updated = dict(artifacts, centroids=centroids, counts=counts)
+
+    df = df.copy()
+    df["Cluster"] = cluster_column(nearest_centroid(X_scaled, centroids))
+
+    report = {
+        "mode": mode,
+        "n_iter": n_iter,
+        "centroid_shift": shift,
+        "max_centroid_shift": float(shift.max()),
+    }
+
+    return df, updated, report
+
+
 def map_failure_mode_persona(df: pd.DataFrame):
     persona_map = {
         0: "Disengaged Despite Resources",
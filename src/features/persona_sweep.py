@@ -0,0 +1,137 @@
+# Persona-count sweep: re-validates n_clusters for assign_persona_clusters.
+#
+# Each k is fitted in its own process. Inertia uses every student;
+# silhouette (O(n^2)) is computed on a subsample stratified by the fitted
+# clusters so small personas stay represented and cost stays bounded.
+#
+#   python src/features/persona_sweep.py --features student_features.csv
+#
+# where student_features.csv is a scored table, e.g. the output of
+# src/pipeline/streaming.py.
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from sklearn.metrics import silhouette_score
+from threadpoolctl import threadpool_limits
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from src.features.persona_clustering import prepare_clustering_features
+
+
+CLUSTER_FEATURES = ["gap_for_clustering", "Sleep_Hours", "Motivation_Level", "Attendance", "resource_index"]
+
+
+def stratified_subsample(labels, sample_size: int, random_state: int = 42):
+    """
+    Row positions for a sample of about sample_size rows, drawn from each
+    label in proportion to its size (at least two rows per label).
+    """
+    labels = np.asarray(labels)
+    if sample_size >= len(labels):
+        return np.arange(len(labels))
+
+    rng = np.random.default_rng(random_state)
+    fraction = sample_size / len(labels)
+
+    picked = []
+    for label in np.unique(labels):
+        members = np.flatnonzero(labels == label)
+        n = min(len(members), max(2, int(round(len(members) * fraction))))
+        picked.append(rng.choice(members, size=n, replace=False))
+
+    return np.sort(np.concatenate(picked))
+
+
+def evaluate_k(
+    X_scaled,
+    k: int,
+    sample_size: int = 2000,
+    random_state: int = 42,
+    n_init: int = 10,
+) -> dict:
+    start = time.perf_counter()
+
+    # One core per process; the pool provides the parallelism
+    with threadpool_limits(limits=1):
+        kmeans = KMeans(n_clusters=k, random_state=random_state, n_init=n_init)
+        labels = kmeans.fit_predict(X_scaled)
+
+        sample = stratified_subsample(labels, sample_size, random_state)
+        silhouette = silhouette_score(X_scaled[sample], labels[sample])
+
+    return {
+        "k": k,
+        "inertia": float(kmeans.inertia_),
+        "silhouette": float(silhouette),
+        "silhouette_sample_size": int(len(sample)),
+        "smallest_cluster": int(np.bincount(labels).min()),
+        "n_iter": int(kmeans.n_iter_),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def sweep_persona_counts(
+    X_scaled,
+    k_values=range(2, 9),
+    sample_size: int = 2000,
+    n_jobs: int = None,
+    random_state: int = 42,
+) -> pd.DataFrame:
+    """
+    Evaluates every k in parallel (n_jobs processes, default: all cores)
+    and returns one row per k, sorted by k.
+    """
+    results = []
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        futures = [
+            pool.submit(evaluate_k, X_scaled, k, sample_size, random_state)
+            for k in k_values
+        ]
+        for future in as_completed(futures):
+            results.append(future.result())
+
+    return pd.DataFrame(results).sort_values("k").reset_index(drop=True)
+
+
+def write_sweep_report(results: pd.DataFrame, path: str) -> None:
+    results.to_csv(path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate persona counts in parallel.")
+    parser.add_argument("--features", required=True, help="scored feature table (.csv or .parquet)")
+    parser.add_argument("--k-min", type=int, default=2)
+    parser.add_argument("--k-max", type=int, default=8)
+    parser.add_argument("--sample-size", type=int, default=2000)
+    parser.add_argument("--jobs", type=int, default=None)
+    parser.add_argument("--output", default="persona_sweep.csv")
+    args = parser.parse_args()
+
+    if args.features.endswith(".parquet"):
+        df = pd.read_parquet(args.features)
+    else:
+        df = pd.read_csv(args.features)
+
+    X_scaled, _ = prepare_clustering_features(df, CLUSTER_FEATURES)
+
+    results = sweep_persona_counts(
+        X_scaled,
+        k_values=range(args.k_min, args.k_max + 1),
+        sample_size=args.sample_size,
+        n_jobs=args.jobs,
+    )
+    write_sweep_report(results, args.output)
+
+    print(results.to_string(index=False))
+    print(f"✅ Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
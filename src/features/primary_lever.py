@@ -1,4 +1,11 @@
 # Autogenerated module
+from src.features.rule_engine import (
+    LEVER_RULES_PATH,
+    load_rule_table,
+    evaluate_rules,
+)
+
+
 def assign_primary_lever(row):
     if row["effort_outcome_gap_z"] >= -0.2:
         return "NO_INTERVENTION"
@@ -18,7 +25,11 @@ def assign_primary_lever(row):
     return "TUTORING"
 
 
-def add_primary_lever(df):
+def add_primary_lever(df, rules_path: str = LEVER_RULES_PATH):
+    """
+    Vectorized over the whole frame using the rule table at rules_path
+    (src/config/lever_rules.json mirrors assign_primary_lever).
+    """
     df = df.copy()
-    df["primary_lever"] = df.apply(assign_primary_lever, axis=1)
+    df["primary_lever"] = evaluate_rules(df, load_rule_table(rules_path))
     return df
\ No newline at end of file
@@ -1,16 +1,31 @@
 # Autogenerated module
+import numpy as np
 import pandas as pd
 from sklearn.preprocessing import MinMaxScaler
 
+from src.features.rule_engine import (
+    MISMATCH_RULES_PATH,
+    load_rule_table,
+    evaluate_rules,
+)
+
 
 def compute_resource_index(
     df: pd.DataFrame,
     resource_cols,
+    scaler=None,
 ):
-    scaler = MinMaxScaler()
+    """
+    Fits a new MinMaxScaler unless a fitted one is passed in, in which case
+    it is only applied, so chunks and single students share one scale.
+    """
     norm_cols = [col + "_norm" for col in resource_cols]
 
-    scaled = scaler.fit_transform(df[resource_cols])
+    if scaler is None:
+        scaler = MinMaxScaler()
+        scaled = scaler.fit_transform(df[resource_cols])
+    else:
+        scaled = scaler.transform(df[resource_cols])
 
     df = df.copy()
     df[norm_cols] = scaled
@@ -19,6 +34,33 @@ def compute_resource_index(
     return df, scaler
 
 
+def save_resource_scaler(
+    scaler,
+    resource_cols,
+    path: str = "models/resource_scaler.npz",
+) -> None:
+    np.savez(
+        path,
+        resource_cols=np.array(resource_cols),
+        data_min=scaler.data_min_,
+        data_max=scaler.data_max_,
+    )
+
+
+def load_resource_scaler(path: str = "models/resource_scaler.npz"):
+    """
+    Rebuilds the fitted MinMaxScaler from its saved min/max; fitting on
+    the two bound rows reproduces the original scale_ and min_.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        bounds = pd.DataFrame(
+            [data["data_min"], data["data_max"]],
+            columns=data["resource_cols"].tolist(),
+        )
+
+    return MinMaxScaler().fit(bounds)
+
+
 def classify_resource_mismatch(row):
     r = row["resource_index"]
     g = row["effort_outcome_gap_z"]
@@ -35,10 +77,14 @@ def classify_resource_mismatch(row):
     return "LOW"
 
 
-def add_resource_mismatch_flag(df: pd.DataFrame):
+def add_resource_mismatch_flag(
+    df: pd.DataFrame,
+    rules_path: str = MISMATCH_RULES_PATH,
+):
+    """
+    Vectorized over the whole frame using the rule table at rules_path
+    (src/config/mismatch_rules.json mirrors classify_resource_mismatch).
+    """
     df = df.copy()
-    df["resource_mismatch_flag"] = df.apply(
-        classify_resource_mismatch,
-        axis=1,
-    )
+    df["resource_mismatch_flag"] = evaluate_rules(df, load_rule_table(rules_path))
     return df
\ No newline at end of file
@@ -0,0 +1,100 @@
+# Ordered rule tables evaluated with np.select.
+#
+# A rule table is JSON:
+#   {"column": "primary_lever", "default": "TUTORING",
+#    "rules": [{"when": "Sleep_Hours <= 6", "label": "SLEEP"}, ...]}
+# Rules are checked top to bottom and the first match wins, exactly like
+# the if-chains in primary_lever.py / resource_mismatch.py. A "when" is one
+# or more "<column> <op> <number>" comparisons joined by "and".
+import json
+import os
+import operator
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+CONFIG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "config"))
+
+LEVER_RULES_PATH = os.path.join(CONFIG_DIR, "lever_rules.json")
+MISMATCH_RULES_PATH = os.path.join(CONFIG_DIR, "mismatch_rules.json")
+
+OPERATORS = {
+    "<=": operator.le,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    ">": operator.gt,
+}
+
+_COMPARISON = re.compile(r"^\s*(\w+)\s*(<=|>=|==|!=|<|>)\s*(-?\d+(?:\.\d+)?)\s*$")
+
+
+def parse_condition(when: str) -> list:
+    """
+    "a >= 1 and b < 2" -> [("a", ">=", 1.0), ("b", "<", 2.0)]
+    """
+    comparisons = []
+    for part in re.split(r"\s+and\s+", when.strip()):
+        match = _COMPARISON.match(part)
+        if match is None:
+            raise ValueError(f"Cannot parse rule condition: {part!r}")
+        column, op, value = match.groups()
+        comparisons.append((column, op, float(value)))
+    return comparisons
+
+
+def compile_rule_table(table: dict) -> dict:
+    if "rules" not in table or "default" not in table:
+        raise ValueError("Rule table needs 'rules' and 'default'")
+
+    return {
+        "column": table.get("column"),
+        "default": table["default"],
+        "rules": [
+            (parse_condition(rule["when"]), rule["label"])
+            for rule in table["rules"]
+        ],
+    }
+
+
+@lru_cache(maxsize=32)
+def _load_rule_table(path: str, mtime_ns: int, size: int) -> dict:
+    with open(path) as f:
+        return compile_rule_table(json.load(f))
+
+
+def load_rule_table(path: str) -> dict:
+    """
+    Compiled table, cached per file version: editing the JSON (new mtime or
+    size) takes effect on the next call without a restart.
+    """
+    stat = os.stat(path)
+    return _load_rule_table(path, stat.st_mtime_ns, stat.st_size)
+
+
+def evaluate_rules(df: pd.DataFrame, compiled: dict) -> np.ndarray:
+    """
+    First matching label per row. Comparisons against NaN are False, as in
+    the row-wise if-chains. A table with no rules labels every row with
+    its default.
+    """
+    if not compiled["rules"]:
+        return np.full(len(df), compiled["default"], dtype=object)
+
+    conditions = []
+    labels = []
+
+    for comparisons, label in compiled["rules"]:
+        mask = np.ones(len(df), dtype=bool)
+        for column, op, value in comparisons:
+            # float view: nullable (e.g. compact Int8) columns give NaN, so
+            # a missing value never matches, same as a NaN float column
+            mask &= OPERATORS[op](df[column].to_numpy(dtype=float, na_value=np.nan), value)
+        conditions.append(mask)
+        labels.append(label)
+
+    return np.select(conditions, labels, default=compiled["default"]).astype(object)
@@ -0,0 +1,114 @@
+# Fused StandardScaler + linear model scorer.
+#
+# model.predict(scaler.transform(X)) == X @ weights + bias when the model is
+# linear, so the two joblib artifacts can be collapsed into one weight vector
+# over raw features. Only numpy is needed to load and apply the result.
+import numpy as np
+import pandas as pd
+
+
+def _fold_scaler(model, scaler):
+    coef = np.asarray(model.coef_, dtype=float)
+    mean = scaler.mean_ if scaler.mean_ is not None else np.zeros_like(coef)
+    scale = scaler.scale_ if scaler.scale_ is not None else np.ones_like(coef)
+
+    weights = coef / np.asarray(scale, dtype=float)
+    bias = float(np.ravel(model.intercept_)[0]) - float(np.dot(weights, mean))
+    return weights, bias
+
+
+def is_affine_model(model, scaler, n_probe: int = 8) -> bool:
+    """
+    True when model.predict(scaler.transform(X)) equals X @ weights + bias
+    for the folded coefficients. A 1-D coef_ is not enough on its own: GLMs
+    such as PoissonRegressor have one too but apply a non-identity link,
+    so the fold is checked against real predictions on a few probe rows
+    spread around the scaler's mean.
+    """
+    coef = getattr(model, "coef_", None)
+    if coef is None or np.ndim(coef) != 1:
+        return False
+    if not (hasattr(scaler, "mean_") and hasattr(scaler, "scale_")):
+        return False
+
+    try:
+        weights, bias = _fold_scaler(model, scaler)
+        mean = scaler.mean_ if scaler.mean_ is not None else np.zeros_like(weights)
+        scale = scaler.scale_ if scaler.scale_ is not None else np.ones_like(weights)
+
+        rng = np.random.default_rng(0)
+        X = mean + scale * rng.standard_normal((n_probe, len(weights)))
+        if hasattr(scaler, "feature_names_in_"):
+            X = pd.DataFrame(X, columns=scaler.feature_names_in_)
+
+        predicted = np.asarray(model.predict(scaler.transform(X)), dtype=float)
+        folded = np.asarray(X, dtype=float) @ weights + bias
+    except Exception:
+        return False
+
+    return predicted.shape == folded.shape and np.allclose(predicted, folded, rtol=1e-9, atol=1e-6)
+
+
+def fuse_linear_model(model, scaler, feature_cols=None) -> dict:
+    """
+    Folds scaler mean_/scale_ into the model coefficients.
+    Feature order follows scaler.feature_names_in_ when available.
+    Raises ValueError for models the fold cannot reproduce exactly.
+    """
+    coef = np.asarray(model.coef_, dtype=float)
+    if coef.ndim != 1:
+        raise ValueError("Fused scoring needs a single-output linear model")
+
+    if hasattr(scaler, "feature_names_in_"):
+        feature_cols = list(scaler.feature_names_in_)
+    if feature_cols is None or len(feature_cols) != coef.shape[0]:
+        raise ValueError("feature_cols must match the model's coefficients")
+
+    if not is_affine_model(model, scaler):
+        raise ValueError(
+            f"{type(model).__name__} is not affine in its inputs (e.g. a GLM with a "
+            "non-identity link); score it with model.predict instead"
+        )
+
+    weights, bias = _fold_scaler(model, scaler)
+
+    return {
+        "feature_cols": list(feature_cols),
+        "weights": weights,
+        "bias": bias,
+    }
+
+
+def export_fused_scorer(
+    model,
+    scaler,
+    path: str = "models/exam_scorer.npz",
+    feature_cols=None,
+) -> dict:
+    scorer = fuse_linear_model(model, scaler, feature_cols)
+
+    np.savez(
+        path,
+        feature_cols=np.array(scorer["feature_cols"]),
+        weights=scorer["weights"],
+        bias=np.array(scorer["bias"]),
+    )
+
+    return scorer
+
+
+def load_fused_scorer(path: str = "models/exam_scorer.npz") -> dict:
+    with np.load(path, allow_pickle=False) as data:
+        return {
+            "feature_cols": data["feature_cols"].tolist(),
+            "weights": data["weights"],
+            "bias": float(data["bias"]),
+        }
+
+
+def predict_fused(scorer: dict, df):
+    """
+    Scores the feature table with a single matrix-vector product.
+    """
+    X = df[scorer["feature_cols"]].to_numpy(dtype=float)
+    return X @ scorer["weights"] + scorer["bias"]
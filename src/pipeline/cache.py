@@ -0,0 +1,164 @@
+# Content-addressed Parquet cache for the finished feature table.
+#
+# The key is a hash of the input CSV bytes, every model/scaler artifact and
+# PIPELINE_VERSION, so any change to data, artifacts or pipeline logic maps
+# to a new entry. Bump PIPELINE_VERSION whenever build_feature_table changes
+# what it computes.
+import hashlib
+import os
+import tempfile
+
+import pandas as pd
+
+
+PIPELINE_VERSION = "1"
+
+DEFAULT_CACHE_DIR = ".cache/feature_tables"
+
+_PREFIX = "feature_table_"
+_SUFFIX = ".parquet"
+
+
+def hash_file(path: str, hasher=None, block_size: int = 1 << 20):
+    hasher = hasher or hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            hasher.update(block)
+    return hasher
+
+
+def feature_table_cache_key(
+    data_path: str,
+    artifact_paths,
+    version: str = PIPELINE_VERSION,
+) -> str:
+    """
+    Missing artifacts (e.g. an optional scorer) are hashed as absent so
+    that creating them later still invalidates the cache.
+    """
+    hasher = hashlib.sha256()
+    hasher.update(f"pipeline:{version}".encode())
+
+    for path in [data_path, *artifact_paths]:
+        hasher.update(f"|{os.path.basename(path)}:".encode())
+        if os.path.exists(path):
+            hash_file(path, hasher)
+        else:
+            hasher.update(b"<missing>")
+
+    return hasher.hexdigest()
+
+
+def cache_entry_path(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, f"{_PREFIX}{key}{_SUFFIX}")
+
+
+def load_cached_feature_table(cache_dir: str, key: str):
+    """
+    Returns the cached table, or None on a miss.
+    """
+    path = cache_entry_path(cache_dir, key)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        df = pd.read_parquet(path)
+    except Exception:
+        # A truncated or unreadable entry is treated as a miss
+        os.remove(path)
+        return None
+
+    # Touch so eviction treats the entry as recently used
+    os.utime(path)
+    return df
+
+
+def store_feature_table(df: pd.DataFrame, cache_dir: str, key: str) -> str:
+    os.makedirs(cache_dir, exist_ok=True)
+    path = cache_entry_path(cache_dir, key)
+
+    # Unique temp file per writer: Streamlit sessions are threads of one
+    # process, so a pid-based name would be shared by concurrent cold starts
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=f"{_PREFIX}{key}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return path
+
+
+def latest_cache_entry(cache_dir: str = DEFAULT_CACHE_DIR):
+    """
+    Path of the most recently used cached table, or None. Lets headless
+    jobs pick up what the dashboard last loaded.
+    """
+    if not os.path.isdir(cache_dir):
+        return None
+
+    entries = [
+        os.path.join(cache_dir, name)
+        for name in os.listdir(cache_dir)
+        if name.startswith(_PREFIX) and name.endswith(_SUFFIX)
+    ]
+    return max(entries, key=os.path.getmtime) if entries else None
+
+
+def evict_stale_entries(
+    cache_dir: str,
+    keep_key: str = None,
+    max_entries: int = 2,
+) -> list:
+    """
+    Keeps the max_entries most recently used tables (always including
+    keep_key) and deletes the rest. Returns the removed paths.
+    """
+    if not os.path.isdir(cache_dir):
+        return []
+
+    entries = [
+        os.path.join(cache_dir, name)
+        for name in os.listdir(cache_dir)
+        if name.startswith(_PREFIX) and name.endswith(_SUFFIX)
+    ]
+    entries.sort(key=os.path.getmtime, reverse=True)
+
+    keep = set(entries[:max_entries])
+    if keep_key is not None:
+        keep.add(cache_entry_path(cache_dir, keep_key))
+
+    removed = []
+    for path in entries:
+        if path not in keep:
+            os.remove(path)
+            removed.append(path)
+
+    return removed
+
+
+def load_or_build_feature_table(
+    data_path: str,
+    artifact_paths,
+    build,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    max_entries: int = 2,
+):
+    """
+    Returns (df, hit). On a miss build() is called, its result stored and
+    stale entries evicted.
+    """
+    key = feature_table_cache_key(data_path, artifact_paths)
+
+    df = load_cached_feature_table(cache_dir, key)
+    if df is not None:
+        return df, True
+
+    df = build()
+    store_feature_table(df, cache_dir, key)
+    evict_stale_entries(cache_dir, keep_key=key, max_entries=max_entries)
+
+    return df, False
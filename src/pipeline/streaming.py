@@ -0,0 +1,194 @@
+# Chunked ingestion for district-scale Student_data.csv exports.
+#
+# Two passes over the file, each holding one chunk at a time:
+#   1. fit   - score gaps and collect dataset-wide gap statistics and the
+#              resource-index min/max (skipped when the persisted
+#              models/resource_scaler.npz is used)
+#   2. emit  - score again, normalize against the pass-1 statistics and
+#              write each finished chunk straight to the output file
+#
+# Per-chunk statistics would give every chunk its own z-score and resource
+# scale, so the second pass is what keeps chunked output consistent with
+# the in-memory pipeline.
+import argparse
+import os
+import sys
+
+import joblib
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from src.data.preprocessing import preprocess_students
+from src.features.effort_gap import (
+    GapStatistics,
+    accumulate_gap_statistics,
+    normalize_effort_outcome_gap,
+)
+from src.features.resource_mismatch import (
+    compute_resource_index,
+    add_resource_mismatch_flag,
+    load_resource_scaler,
+)
+from src.features.primary_lever import add_primary_lever
+from src.features.intervention_simulation import add_expected_score_improvement
+from src.features.persona_clustering import (
+    load_persona_artifacts,
+    assign_nearest_persona,
+    map_failure_mode_persona,
+)
+
+
+FEATURE_COLS = [
+    "Hours_Studied", "Attendance", "Sleep_Hours", "Previous_Scores",
+    "Tutoring_Sessions", "Physical_Activity", "Internet_Access",
+    "Extracurricular_Activities", "Learning_Disabilities", "Gender",
+    "School_Type_Public", "Parental_Involvement", "Access_to_Resources",
+    "Motivation_Level", "Family_Income", "Peer_Influence",
+]
+
+RESOURCE_COLS = ["Access_to_Resources", "Internet_Access", "Family_Income"]
+
+DEFAULT_CHUNKSIZE = 50_000
+
+
+def read_student_chunks(data_path: str, chunksize: int = DEFAULT_CHUNKSIZE):
+    """
+    Yields preprocessed chunks with Student_IDs numbered across the file.
+    """
+    offset = 0
+    for chunk in pd.read_csv(data_path, chunksize=chunksize):
+        yield preprocess_students(chunk, inplace=True, id_offset=offset)
+        offset += len(chunk)
+
+
+def fit_stream_statistics(
+    data_path: str,
+    model,
+    scaler,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    feature_cols=FEATURE_COLS,
+    resource_cols=RESOURCE_COLS,
+    resource_scaler=None,
+) -> dict:
+    """
+    Pass 1: dataset-wide gap statistics, plus a resource MinMaxScaler
+    accumulated chunk by chunk unless a persisted one is given.
+    """
+    gap_stats = GapStatistics()
+    fit_resources = resource_scaler is None
+    if fit_resources:
+        resource_scaler = MinMaxScaler()
+
+    for chunk in read_student_chunks(data_path, chunksize):
+        accumulate_gap_statistics(chunk, model, scaler, feature_cols, gap_stats)
+        if fit_resources:
+            resource_scaler.partial_fit(chunk[resource_cols])
+
+    if gap_stats.count < 2:
+        raise ValueError("Need at least two scored students to normalize gaps")
+
+    return {
+        "gap_stats": gap_stats,
+        "resource_scaler": resource_scaler,
+    }
+
+
+def iter_feature_chunks(
+    data_path: str,
+    model,
+    scaler,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    stats: dict = None,
+    feature_cols=FEATURE_COLS,
+    resource_cols=RESOURCE_COLS,
+    persona_artifacts: dict = None,
+):
+    """
+    Pass 2: yields scored chunks (gap, resource index, mismatch flag,
+    primary lever, expected improvement, and personas when persisted
+    centroids are given). Runs pass 1 first unless precomputed stats
+    are given.
+    """
+    if stats is None:
+        stats = fit_stream_statistics(
+            data_path, model, scaler, chunksize, feature_cols, resource_cols
+        )
+
+    for chunk in read_student_chunks(data_path, chunksize):
+        chunk = normalize_effort_outcome_gap(
+            chunk, model, scaler, feature_cols, stats["gap_stats"]
+        )
+        chunk, _ = compute_resource_index(chunk, resource_cols, stats["resource_scaler"])
+        chunk = add_resource_mismatch_flag(chunk)
+        if persona_artifacts is not None:
+            chunk = assign_nearest_persona(chunk, persona_artifacts)
+            chunk = map_failure_mode_persona(chunk)
+        chunk = add_primary_lever(chunk)
+        chunk = add_expected_score_improvement(chunk, model, scaler, feature_cols)
+
+        yield chunk
+
+
+def stream_feature_table(
+    data_path: str,
+    output_path: str,
+    model,
+    scaler,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    persona_artifacts: dict = None,
+    resource_scaler=None,
+) -> dict:
+    """
+    Writes the scored table to output_path (CSV) one chunk at a time.
+    """
+    rows = 0
+    chunks = 0
+
+    stats = fit_stream_statistics(
+        data_path, model, scaler, chunksize, resource_scaler=resource_scaler
+    )
+
+    for chunk in iter_feature_chunks(
+        data_path, model, scaler, chunksize, stats=stats, persona_artifacts=persona_artifacts
+    ):
+        chunk.to_csv(output_path, mode="w" if chunks == 0 else "a", header=chunks == 0, index=False)
+        rows += len(chunk)
+        chunks += 1
+
+    return {"rows": rows, "chunks": chunks, "output_path": output_path}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a student export in bounded memory.")
+    parser.add_argument("--data", default="notebooks/Student_data.csv")
+    parser.add_argument("--output", default="student_features.csv")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--model", default=os.getenv("MODEL_PATH", "models/exam_model.joblib"))
+    parser.add_argument("--scaler", default=os.getenv("SCALER_PATH", "models/scaler.joblib"))
+    parser.add_argument("--personas", default=os.getenv("PERSONA_PATH", "models/persona_centroids.npz"))
+    parser.add_argument("--resource-scaler", default=os.getenv("RESOURCE_SCALER_PATH", "models/resource_scaler.npz"))
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    scaler = joblib.load(args.scaler)
+    personas = load_persona_artifacts(args.personas) if os.path.exists(args.personas) else None
+    resource_scaler = (
+        load_resource_scaler(args.resource_scaler)
+        if os.path.exists(args.resource_scaler) else None
+    )
+
+    summary = stream_feature_table(
+        args.data,
+        args.output,
+        model,
+        scaler,
+        args.chunksize,
+        persona_artifacts=personas,
+        resource_scaler=resource_scaler,
+    )
+    print(f"✅ Wrote {summary['rows']} students in {summary['chunks']} chunks to {summary['output_path']}")
+
+
+if __name__ == "__main__":
+    main()
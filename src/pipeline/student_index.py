@@ -0,0 +1,38 @@
+# Student_ID -> row position lookup for the finished feature table.
+#
+# Built once when a table is loaded, so per-student views fetch a row by
+# position instead of scanning the Student_ID column on every rerun.
+import pandas as pd
+
+
+def build_student_index(df: pd.DataFrame) -> dict:
+    """
+    positions: Student_ID -> first row position
+    options: unique Student_IDs in table order (as df["Student_ID"].unique())
+    option_positions: Student_ID -> position in options
+    """
+    positions = {}
+    for position, student_id in enumerate(df["Student_ID"].tolist()):
+        positions.setdefault(student_id, position)
+
+    options = list(positions)
+    return {
+        "positions": positions,
+        "options": options,
+        "option_positions": {student_id: i for i, student_id in enumerate(options)},
+    }
+
+
+def get_student_row(df: pd.DataFrame, index: dict, student_id) -> pd.Series:
+    return df.iloc[index["positions"][student_id]]
+
+
+def options_excluding(index: dict, student_id) -> list:
+    """
+    Selectbox options without student_id, e.g. for a comparison picker.
+    """
+    options = index["options"]
+    position = index["option_positions"].get(student_id)
+    if position is None:
+        return options
+    return options[:position] + options[position + 1:]
@@ -1,6 +1,7 @@
 import pandas as pd
 import joblib
 import os
+import sys
 from sklearn.preprocessing import StandardScaler
 
 # Import your existing logic
@@ -11,6 +12,21 @@ from src.data.preprocessing import (
     encode_binary_features
 )
 from src.models.exam_score_model import train_exam_score_model
+from src.models.fused_scorer import export_fused_scorer
+from src.features.effort_gap import compute_effort_outcome_gap
+from src.features.resource_mismatch import (
+    compute_resource_index,
+    save_resource_scaler,
+    load_resource_scaler,
+)
+from src.features.persona_clustering import (
+    prepare_clustering_features,
+    assign_persona_clusters,
+    build_persona_artifacts,
+    save_persona_artifacts,
+    load_persona_artifacts,
+    recluster_personas,
+)
 
 def create_joblib_files():
     # 1. Load Data
@@ -50,8 +66,99 @@ def create_joblib_files():
     os.makedirs("models", exist_ok=True)
     joblib.dump(model, "models/exam_model.joblib")
     joblib.dump(scaler, "models/scaler.joblib")
+    export_fused_scorer(model, scaler, "models/exam_scorer.npz")
     
-    print("✅ Success! Created models/exam_model.joblib and models/scaler.joblib")
+    print("✅ Success! Created models/exam_model.joblib, models/scaler.joblib and models/exam_scorer.npz")
+
+def build_clustering_table(data_path):
+    df = pd.read_csv(data_path)
+
+    df = add_student_id(df)
+    df = drop_unused_columns(df)
+    df = encode_ordinal_features(df)
+    df = encode_binary_features(df)
+
+    model = joblib.load("models/exam_model.joblib")
+    scaler = joblib.load("models/scaler.joblib")
+
+    feature_cols = list(scaler.feature_names_in_)
+    df = compute_effort_outcome_gap(df, model, scaler, feature_cols)
+
+    resource_cols = ["Access_to_Resources", "Internet_Access", "Family_Income"]
+    resource_scaler = None
+    if os.path.exists("models/resource_scaler.npz"):
+        resource_scaler = load_resource_scaler("models/resource_scaler.npz")
+    df, _ = compute_resource_index(df, resource_cols, resource_scaler)
+
+    return df
+
+def create_resource_artifacts():
+    """
+    Fits the resource-index MinMaxScaler once so chunks, subsets and single
+    students are all scaled against the same min/max.
+    """
+    data_path = "notebooks/Student_data.csv"
+    if not os.path.exists(data_path):
+        print("Error: Student_data.csv not found in notebooks folder.")
+        return
+
+    df = pd.read_csv(data_path)
+    df = drop_unused_columns(df)
+    df = encode_ordinal_features(df)
+    df = encode_binary_features(df)
+
+    resource_cols = ["Access_to_Resources", "Internet_Access", "Family_Income"]
+    _, resource_scaler = compute_resource_index(df, resource_cols)
+    save_resource_scaler(resource_scaler, resource_cols, "models/resource_scaler.npz")
+
+    print("✅ Success! Created models/resource_scaler.npz")
+
+def create_persona_artifacts():
+    """
+    Offline persona refit. The dashboard labels students against the saved
+    centroids instead of running KMeans on every load.
+    """
+    data_path = "notebooks/Student_data.csv"
+    if not os.path.exists(data_path):
+        print("Error: Student_data.csv not found in notebooks folder.")
+        return
+
+    df = build_clustering_table(data_path)
+
+    cluster_features = ["gap_for_clustering", "Sleep_Hours", "Motivation_Level", "Attendance", "resource_index"]
+    X_cluster_scaled, cluster_scaler = prepare_clustering_features(df, cluster_features)
+    _, kmeans = assign_persona_clusters(df, X_cluster_scaled, n_clusters=4)
+
+    artifacts = build_persona_artifacts(cluster_scaler, kmeans, cluster_features)
+    save_persona_artifacts(artifacts, "models/persona_centroids.npz")
+
+    print("✅ Success! Created models/persona_centroids.npz")
+
+def refresh_persona_artifacts():
+    """
+    Weekly refresh: re-cluster warm-started from the saved centroids
+    instead of a cold 10-restart KMeans fit.
+    """
+    data_path = "notebooks/Student_data.csv"
+    artifact_path = "models/persona_centroids.npz"
+    if not os.path.exists(artifact_path):
+        print("No persona artifacts yet, running a full fit instead.")
+        create_persona_artifacts()
+        return
+
+    df = build_clustering_table(data_path)
+    artifacts = load_persona_artifacts(artifact_path)
+
+    _, artifacts, report = recluster_personas(df, artifacts, mode="warm")
+    save_persona_artifacts(artifacts, artifact_path)
+
+    shifts = ", ".join(f"{shift:.4f}" for shift in report["centroid_shift"])
+    print(f"✅ Re-clustered in {report['n_iter']} iterations; centroid shifts: {shifts}")
 
 if __name__ == "__main__":
-    create_joblib_files()
+    if "--refresh-personas" in sys.argv:
+        refresh_persona_artifacts()
+    else:
+        create_joblib_files()
+        create_resource_artifacts()
+        create_persona_artifacts()
\ No newline at end of file
@@ -11,28 +11,41 @@ import streamlit.components.v1 as components
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 # Internal Project Imports
-from src.data.preprocessing import (
-    add_student_id,
-    drop_unused_columns,
-    encode_ordinal_features,
-    encode_binary_features,
+from src.data.preprocessing import preprocess_students
+from src.features.effort_gap import (
+    compute_effort_outcome_gap,
+    compute_effort_outcome_gap_fused,
 )
-from src.features.effort_gap import compute_effort_outcome_gap
+from src.models.fused_scorer import fuse_linear_model
 from src.features.resource_mismatch import (
     compute_resource_index,
     add_resource_mismatch_flag,
+    load_resource_scaler,
 )
 from src.features.persona_clustering import (
     prepare_clustering_features,
     assign_persona_clusters,
     map_failure_mode_persona,
+    load_persona_artifacts,
+    assign_nearest_persona,
 )
 from src.features.primary_lever import add_primary_lever
+from src.features.rule_engine import LEVER_RULES_PATH, MISMATCH_RULES_PATH
 from src.features.intervention_simulation import (
     add_expected_score_improvement,
+    simulate_all_levers,
+    add_best_lever_by_gain,
+    is_linear_exam_model,
 )
-from src.explainability.build_payload import build_genai_payload
-from src.explainability.genai_engine import generate_teacher_explanation
+from src.pipeline.cache import load_or_build_feature_table
+from src.pipeline.student_index import build_student_index, get_student_row, options_excluding
+from src.explainability.build_payload import build_student_payload
+from src.explainability.genai_engine import (
+    stream_teacher_explanation,
+    is_genai_available,
+)
+from src.explainability.response_cache import ResponseCache
+from src.explainability.precompute import PlaybookStore, playbook_key
 
 from ui.visuals import plot_risk_distribution, plot_priority_scatter, plot_student_radar
 
@@ -248,6 +261,23 @@ def get_persona_color(persona):
     }
     return color_map.get(persona, "var(--primary)")
 
+def render_playbook_card(report):
+    return (
+        f'<div style="padding: 20px; background: rgba(0, 20, 51, 0.5); border-radius: 12px; border: 1px solid rgba(0, 102, 255, 0.3); margin-top: 20px;">'
+        '<div style="display: flex; align-items: center; margin-bottom: 15px;">'
+        '<div style="width: 40px; height: 40px; background: linear-gradient(135deg, #0066FF, #3B82F6); border-radius: 10px; display: flex; align-items: center; justify-content: center; margin-right: 15px;">'
+        '<span style="font-size: 20px;">🤖</span>'
+        '</div>'
+        '<div>'
+        '<div style="font-size: 18px; font-weight: bold; color: #E5F0FF;">Personalized Intervention Plan</div>'
+        '<div style="font-size: 12px; color: #8CA3C7;">Generated by PARIX AI</div>'
+        '</div>'
+        '</div>'
+        '<div style="height: 1px; background: linear-gradient(90deg, transparent, rgba(0, 102, 255, 0.3), transparent); margin: 15px 0;"></div>'
+        f'<div style="color: #E5F0FF; line-height: 1.6;">{report.replace(chr(10), "<br>")}</div>'
+        '</div>'
+    )
+
 def create_download_link(df, filename="student_data.csv"):
     csv = df.to_csv(index=False)
     b64 = base64.b64encode(csv.encode()).decode()
@@ -270,36 +300,51 @@ inject_custom_css()
 load_dotenv()
 
 # ----------------------------
-# LOAD ARTIFACTS (Cached)
+# LOAD ARTIFACTS
 # ----------------------------
-@st.cache_resource
-def load_artifacts():
-    model = joblib.load(os.getenv("MODEL_PATH", "models/exam_model.joblib"))
-    scaler = joblib.load(os.getenv("SCALER_PATH", "models/scaler.joblib"))
-    return model, scaler
+DATA_PATH = os.getenv("DATA_PATH", "notebooks/Student_data.csv")
+MODEL_PATH = os.getenv("MODEL_PATH", "models/exam_model.joblib")
+SCALER_PATH = os.getenv("SCALER_PATH", "models/scaler.joblib")
+PERSONA_PATH = os.getenv("PERSONA_PATH", "models/persona_centroids.npz")
+RESOURCE_SCALER_PATH = os.getenv("RESOURCE_SCALER_PATH", "models/resource_scaler.npz")
 
-@st.cache_data
-def load_data():
-    return pd.read_csv(os.getenv("DATA_PATH", "notebooks/Student_data.csv"))
+def load_pipeline_artifacts():
+    """
+    Reads every model/scaler artifact the feature table depends on straight
+    from disk. Only called on a feature-table cache miss, so the table is
+    built from the same files its cache key was hashed from.
+    """
+    return {
+        "model": joblib.load(MODEL_PATH),
+        "scaler": joblib.load(SCALER_PATH),
+        "personas": load_persona_artifacts(PERSONA_PATH) if os.path.exists(PERSONA_PATH) else None,
+        "resource_scaler": (
+            load_resource_scaler(RESOURCE_SCALER_PATH)
+            if os.path.exists(RESOURCE_SCALER_PATH) else None
+        ),
+    }
 
-try:
-    model, scaler = load_artifacts()
-    df_raw = load_data()
-except Exception as e:
-    st.error(f"❌ Error loading data or models: {e}")
-    st.stop()
+@st.cache_resource
+def load_playbook_cache():
+    return ResponseCache(os.getenv("PLAYBOOK_CACHE_PATH", ".cache/playbooks.sqlite"))
+
+@st.cache_resource
+def load_playbook_store():
+    return PlaybookStore(os.getenv("PRECOMPUTED_PLAYBOOKS_PATH", ".cache/precomputed_playbooks.sqlite"))
 
 # ----------------------------
 # PIPELINE
 # ----------------------------
-@st.cache_data
-def build_feature_table(df):
-    df = add_student_id(df)
-    
+# Not st.cache_data: the Parquet cache and session state already memoize the
+# table, and an in-memory memo keyed on the CSV alone would return a stale
+# table after an artifact or rule file changes.
+def build_feature_table(df, artifacts):
+    model, scaler = artifacts["model"], artifacts["scaler"]
+    personas = artifacts["personas"]
+    resource_scaler = artifacts["resource_scaler"]
+
     # 1. Preprocessing
-    df = drop_unused_columns(df)
-    df = encode_ordinal_features(df)
-    df = encode_binary_features(df)
+    df = preprocess_students(df)
 
    # Define feature columns for model input
     feature_cols = [
@@ -310,30 +355,58 @@ def build_feature_table(df):
         "Motivation_Level", "Family_Income", "Peer_Influence"
     ]
 
-    # 2. Effort Gap Analysis
-    df = compute_effort_outcome_gap(df, model, scaler, feature_cols)
+    # 2. Effort Gap Analysis (fused in memory from the same model/scaler the
+    #    simulation uses, so gap and expected gains never disagree on the model;
+    #    models the fold cannot reproduce exactly keep the predict() path)
+    if is_linear_exam_model(model, scaler):
+        scorer = fuse_linear_model(model, scaler, feature_cols)
+        df = compute_effort_outcome_gap_fused(df, scorer)
+    else:
+        df = compute_effort_outcome_gap(df, model, scaler, feature_cols)
 
     # 3. Resource Mismatch
     resource_cols = ["Access_to_Resources", "Internet_Access", "Family_Income"]
-    df, _ = compute_resource_index(df, resource_cols)
+    df, _ = compute_resource_index(df, resource_cols, resource_scaler)
     df = add_resource_mismatch_flag(df)
 
-    # 4. Persona Clustering
-    cluster_features = ["gap_for_clustering", "Sleep_Hours", "Motivation_Level", "Attendance", "resource_index"]
-    X_cluster_scaled, _ = prepare_clustering_features(df, cluster_features)
-    df, _ = assign_persona_clusters(df, X_cluster_scaled, n_clusters=4)
+    # 4. Persona Clustering (refit only when no persisted centroids exist;
+    #    run train_artifacts.py to refresh them)
+    if personas is not None:
+        df = assign_nearest_persona(df, personas)
+    else:
+        cluster_features = ["gap_for_clustering", "Sleep_Hours", "Motivation_Level", "Attendance", "resource_index"]
+        X_cluster_scaled, _ = prepare_clustering_features(df, cluster_features)
+        df, _ = assign_persona_clusters(df, X_cluster_scaled, n_clusters=4)
     df = map_failure_mode_persona(df)
 
     # 5. Interventions
     df = add_primary_lever(df)
     df = add_expected_score_improvement(df, model, scaler, feature_cols)
+    lever_gains = simulate_all_levers(df, model, scaler, feature_cols)
+    df = add_best_lever_by_gain(df, lever_gains)
 
     return df
 
 if "df" not in st.session_state:
-    st.session_state.df = build_feature_table(df_raw)
+    try:
+        # Warm restarts read the finished table from the Parquet cache;
+        # the CSV and artifacts are only read on a miss.
+        st.session_state.df, _ = load_or_build_feature_table(
+            DATA_PATH,
+            [MODEL_PATH, SCALER_PATH, PERSONA_PATH, RESOURCE_SCALER_PATH, LEVER_RULES_PATH, MISMATCH_RULES_PATH],
+            lambda: build_feature_table(pd.read_csv(DATA_PATH), load_pipeline_artifacts()),
+            cache_dir=os.getenv("FEATURE_CACHE_DIR", ".cache/feature_tables"),
+        )
+    except Exception as e:
+        st.error(f"❌ Error loading data or models: {e}")
+        st.stop()
+
+    # Built once per loaded table; Deep Dive lookups and selectbox options
+    # then cost the same whatever the roster size
+    st.session_state.student_index = build_student_index(st.session_state.df)
 
 df = st.session_state.df
+student_index = st.session_state.student_index
 
 # ----------------------------
 # SIDEBAR
@@ -532,7 +605,7 @@ elif screen == "🔍 Student Deep Dive":
     with col1:
         selected_id = st.selectbox(
             "Select Student ID",
-            df["Student_ID"].unique(),
+            student_index["options"],
             format_func=lambda x: f"Student {x}"
         )
     
@@ -543,14 +616,14 @@ elif screen == "🔍 Student Deep Dive":
         if compare_mode:
             compare_id = st.selectbox(
                 "Compare with",
-                df[df["Student_ID"] != selected_id]["Student_ID"].unique(),
+                options_excluding(student_index, selected_id),
                 format_func=lambda x: f"Student {x}"
             )
     
-    student_row = df[df["Student_ID"] == selected_id].iloc[0]
+    student_row = get_student_row(df, student_index, selected_id)
     
     if compare_mode and 'compare_id' in locals():
-        compare_row = df[df["Student_ID"] == compare_id].iloc[0]
+        compare_row = get_student_row(df, student_index, compare_id)
     
     # Student Overview Cards
     st.subheader("📋 Student Overview")
@@ -824,6 +897,12 @@ elif screen == "🔍 Student Deep Dive":
                         delta=None
                     )
                 
+                st.metric(
+                    label="Best Lever by Expected Gain",
+                    value=f"{student_row['best_gain_lever']}",
+                    delta=f"+{student_row['best_lever_gain']:.2f}"
+                )
+                
                 # Resource Index with visual indicator
                 resource_index = student_row['resource_index']
                 st.markdown("**Resource Index:**")
@@ -861,53 +940,45 @@ elif screen == "🔍 Student Deep Dive":
     st.markdown("---")
     st.subheader("🤖 AI-Generated Intervention Strategy")
     
-    ai_col1, ai_col2 = st.columns([3, 1])
-    with ai_col2:
-        if st.button("🎯 Generate Playbook", type="primary", use_container_width=True):
-            st.session_state.generate_playbook = True
-    
-    if st.session_state.get('generate_playbook', False):
-        with st.spinner("🔍 Analyzing student patterns..."):
-            try:
-                input_row = student_row.to_dict()
-                input_row["primary_intervention_lever"] = student_row["primary_lever"]
-                input_row["effort_outcome_gap"] = student_row["effort_outcome_gap"]
-                input_row["persona_label"] = student_row["failure_mode_persona"]
-                input_row["student_context"] = {
-                    "School_Type_Public": student_row["School_Type_Public"],
-                    "learning_disabilities": student_row["Learning_Disabilities"]
-                }
-                
-                payload = build_genai_payload(pd.Series(input_row))
-                report = generate_teacher_explanation(payload)
+    genai_available = is_genai_available()
+
+    # Playbooks for high-risk students are precomputed overnight
+    # (src/explainability/precompute.py); only a miss needs a live call
+    payload = build_student_payload(student_row)
+    precomputed = load_playbook_store().get(selected_id, playbook_key(payload))
+
+    if precomputed is not None:
+        st.caption("🌙 Precomputed overnight")
+        st.markdown(render_playbook_card(precomputed), unsafe_allow_html=True)
+    else:
+        ai_col1, ai_col2 = st.columns([3, 1])
+        with ai_col1:
+            if not genai_available:
+                st.info("ℹ️ AI playbooks are unavailable: OPENROUTER_API_KEY is not configured.")
+        with ai_col2:
+            if st.button("🎯 Generate Playbook", type="primary", use_container_width=True, disabled=not genai_available):
+                st.session_state.generate_playbook = True
+
+    if precomputed is None and genai_available and st.session_state.get('generate_playbook', False):
+        try:
+            # Display AI report in a clean card, filled in as tokens arrive
+            with st.container():
+                card = st.empty()
+                card.markdown(render_playbook_card("🔍 Analyzing student patterns..."), unsafe_allow_html=True)
                 
-                # Display AI report in a clean card
-                with st.container():
-                    st.markdown(
-                        f'<div style="padding: 20px; background: rgba(0, 20, 51, 0.5); border-radius: 12px; border: 1px solid rgba(0, 102, 255, 0.3); margin-top: 20px;">'
-                        '<div style="display: flex; align-items: center; margin-bottom: 15px;">'
-                        '<div style="width: 40px; height: 40px; background: linear-gradient(135deg, #0066FF, #3B82F6); border-radius: 10px; display: flex; align-items: center; justify-content: center; margin-right: 15px;">'
-                        '<span style="font-size: 20px;">🤖</span>'
-                        '</div>'
-                        '<div>'
-                        '<div style="font-size: 18px; font-weight: bold; color: #E5F0FF;">Personalized Intervention Plan</div>'
-                        '<div style="font-size: 12px; color: #8CA3C7;">Generated by PARIX AI</div>'
-                        '</div>'
-                        '</div>'
-                        '<div style="height: 1px; background: linear-gradient(90deg, transparent, rgba(0, 102, 255, 0.3), transparent); margin: 15px 0;"></div>'
-                        f'<div style="color: #E5F0FF; line-height: 1.6;">{report.replace(chr(10), "<br>")}</div>'
-                        '</div>',
-                        unsafe_allow_html=True
-                    )
+                report = ""
+                for chunk in stream_teacher_explanation(payload, cache=load_playbook_cache()):
+                    report += chunk
+                    card.markdown(render_playbook_card(report), unsafe_allow_html=True)
+            
+            # Add reset button
+            #if st.button("🔄 Generate Another"):
+             #   st.session_state.generate_playbook = False
+              #  st.rerun()
                 
-                # Add reset button
-                #if st.button("🔄 Generate Another"):
-                 #   st.session_state.generate_playbook = False
-                  #  st.rerun()
-                    
-            except Exception as e:
-                st.error(f"⚠️ Error generating insights: {e}")
-                st.session_state.generate_playbook = False
+        except Exception as e:
+            st.error(f"⚠️ Error generating insights: {e}")
+            st.session_state.generate_playbook = False
 elif screen == "📈 Class Insights":
     st.markdown("""
     <h1>📈 Class Insights & Analytics</h1>